@@ -1,8 +1,9 @@
-import asyncio
-from .server import main as server_main
-
 def main():
     """Main entry point for the package."""
+    # Imported here so that importing the package stays cheap
+    import asyncio
+    from .server import main as server_main
+
     asyncio.run(server_main())
 
 __all__ = ['main']
\ No newline at end of file
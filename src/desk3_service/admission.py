@@ -0,0 +1,275 @@
+import asyncio
+import os
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from typing import Any, Hashable
+
+import mcp.types as types
+from mcp.server import Server
+
+# Upper bounds (seconds) of the queue time histogram buckets
+QUEUE_TIME_BUCKETS = (0.001, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, float("inf"))
+
+
+class Overloaded(Exception):
+    """
+    Raised when a session or request cannot be admitted.
+    """
+
+
+class QueueTimeStats:
+    """
+    Count, total, max and histogram of queue times.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * len(QUEUE_TIME_BUCKETS)
+
+    def record(self, seconds: float) -> None:
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        for index, bound in enumerate(QUEUE_TIME_BUCKETS):
+            if seconds <= bound:
+                self.buckets[index] += 1
+                break
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "count": self.count,
+            "avg": self.total / self.count if self.count else 0.0,
+            "max": self.max,
+            "buckets": {
+                ("+Inf" if bound == float("inf") else str(bound)): count
+                for bound, count in zip(QUEUE_TIME_BUCKETS, self.buckets)
+            },
+        }
+
+
+class _SessionQueue:
+    def __init__(self, weight: int):
+        self.waiters: deque[asyncio.Future] = deque()
+        self.inflight = 0
+        self.weight = weight
+        self.credit = weight
+
+
+class FairScheduler:
+    """
+    Grants request slots across sessions with weighted round-robin.
+    At most max_inflight requests run at once overall and per_session_limit per
+    session; a session gets up to its weight grants in a row before the next
+    session with queued requests is served.
+    """
+
+    def __init__(self, max_inflight: int = 32, per_session_limit: int = 4, max_queued_per_session: int = 100):
+        self.max_inflight = max_inflight
+        self.per_session_limit = per_session_limit
+        self.max_queued_per_session = max_queued_per_session
+        self.weights: dict[Hashable, int] = {}
+        self.active = 0
+        self.rejected = 0
+        self.queue_time = QueueTimeStats()
+        self._sessions: OrderedDict[Hashable, _SessionQueue] = OrderedDict()
+
+    def set_weight(self, session: Hashable, weight: int) -> None:
+        """
+        Give a session more (or fewer) consecutive grants per round.
+        """
+        self.weights[session] = max(int(weight), 1)
+        if session in self._sessions:
+            self._sessions[session].weight = self.weights[session]
+
+    def _queue(self, session: Hashable) -> _SessionQueue:
+        queue = self._sessions.get(session)
+        if queue is None:
+            queue = _SessionQueue(self.weights.get(session, 1))
+            self._sessions[session] = queue
+        return queue
+
+    def _dispatch(self) -> None:
+        while self.active < self.max_inflight:
+            granted = False
+            for session in list(self._sessions):
+                queue = self._sessions[session]
+                while queue.waiters and queue.waiters[0].done():
+                    # Cancelled while queued
+                    queue.waiters.popleft()
+                if not queue.waiters or queue.inflight >= self.per_session_limit:
+                    continue
+                queue.waiters.popleft().set_result(None)
+                queue.inflight += 1
+                self.active += 1
+                queue.credit -= 1
+                if queue.credit <= 0:
+                    # Used up this round: move to the back of the rotation
+                    queue.credit = queue.weight
+                    self._sessions.move_to_end(session)
+                granted = True
+                break
+            if not granted:
+                return
+
+    def _release(self, session: Hashable) -> None:
+        queue = self._sessions[session]
+        queue.inflight -= 1
+        self.active -= 1
+        if not queue.waiters and queue.inflight == 0:
+            del self._sessions[session]
+        self._dispatch()
+
+    @asynccontextmanager
+    async def slot(self, session: Hashable):
+        """
+        Wait for a request slot for session, run the block, then hand the slot on.
+        :param session: Session identifier
+        """
+        queue = self._queue(session)
+        if len(queue.waiters) >= self.max_queued_per_session:
+            self.rejected += 1
+            raise Overloaded("Too many queued requests for this session")
+        waiter = asyncio.get_running_loop().create_future()
+        queue.waiters.append(waiter)
+        queued_at = time.monotonic()
+        self._dispatch()
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # Slot was granted just before cancellation
+                self._release(session)
+            else:
+                # Still queued: drop the waiter so it is neither counted nor keeps the session alive
+                try:
+                    queue.waiters.remove(waiter)
+                except ValueError:
+                    pass
+                if not queue.waiters and queue.inflight == 0 and self._sessions.get(session) is queue:
+                    del self._sessions[session]
+            raise
+        self.queue_time.record(time.monotonic() - queued_at)
+        try:
+            yield
+        finally:
+            self._release(session)
+
+    def metrics(self) -> dict[str, Any]:
+        return {
+            "active": self.active,
+            "max_inflight": self.max_inflight,
+            "per_session_limit": self.per_session_limit,
+            "queued": sum(len(queue.waiters) for queue in self._sessions.values()),
+            "sessions": len(self._sessions),
+            "rejected": self.rejected,
+            "queue_time": self.queue_time.snapshot(),
+        }
+
+
+class AdmissionController:
+    """
+    Limits concurrent sessions. Beyond max_sessions new sessions wait in a bounded
+    queue for up to wait_timeout seconds, and are rejected when the queue is full.
+    """
+
+    def __init__(self, max_sessions: int = 200, max_waiting: int = 50, wait_timeout: float = 5.0):
+        self.max_sessions = max_sessions
+        self.max_waiting = max_waiting
+        self.wait_timeout = wait_timeout
+        self.active = 0
+        self.waiting = 0
+        self.rejected = 0
+        self.closed = False
+        self.queue_time = QueueTimeStats()
+        self._condition = asyncio.Condition()
+
+    async def close(self) -> None:
+        """
+        Reject all new sessions from now on, including those already waiting. Open sessions are not affected.
+        """
+        async with self._condition:
+            self.closed = True
+            self._condition.notify_all()
+
+    @asynccontextmanager
+    async def session(self):
+        """
+        Admit a session for the duration of the block, raising Overloaded if it cannot be admitted.
+        """
+        queued_at = time.monotonic()
+        async with self._condition:
+            if self.closed:
+                self.rejected += 1
+                raise Overloaded("Server is draining")
+            if self.active >= self.max_sessions:
+                if self.waiting >= self.max_waiting:
+                    self.rejected += 1
+                    raise Overloaded("Too many sessions")
+                self.waiting += 1
+                try:
+                    await asyncio.wait_for(
+                        self._condition.wait_for(lambda: self.closed or self.active < self.max_sessions),
+                        self.wait_timeout,
+                    )
+                except TimeoutError:
+                    self.rejected += 1
+                    raise Overloaded("Timed out waiting for a session slot")
+                finally:
+                    self.waiting -= 1
+                if self.closed:
+                    self.rejected += 1
+                    raise Overloaded("Server is draining")
+            self.active += 1
+        self.queue_time.record(time.monotonic() - queued_at)
+        try:
+            yield
+        finally:
+            async with self._condition:
+                self.active -= 1
+                self._condition.notify()
+
+    def metrics(self) -> dict[str, Any]:
+        return {
+            "active": self.active,
+            "max_sessions": self.max_sessions,
+            "waiting": self.waiting,
+            "closed": self.closed,
+            "rejected": self.rejected,
+            "queue_time": self.queue_time.snapshot(),
+        }
+
+
+def scheduler_from_env() -> FairScheduler:
+    return FairScheduler(
+        max_inflight=int(os.getenv("DESK3_MAX_INFLIGHT", "32")),
+        per_session_limit=int(os.getenv("DESK3_SESSION_INFLIGHT", "4")),
+        max_queued_per_session=int(os.getenv("DESK3_SESSION_MAX_QUEUED", "100")),
+    )
+
+
+def admission_from_env() -> AdmissionController:
+    return AdmissionController(
+        max_sessions=int(os.getenv("DESK3_MAX_SESSIONS", "200")),
+        max_waiting=int(os.getenv("DESK3_SESSION_QUEUE", "50")),
+        wait_timeout=float(os.getenv("DESK3_SESSION_WAIT", "5")),
+    )
+
+
+def install_fair_scheduler(server: Server, scheduler: FairScheduler) -> None:
+    """
+    Route tool calls and resource reads of every session through the scheduler.
+    """
+    if getattr(server, "fair_scheduler", None) is not None:
+        return
+    server.fair_scheduler = scheduler
+    for request_type in (types.CallToolRequest, types.ReadResourceRequest):
+        handler = server.request_handlers[request_type]
+
+        async def scheduled(request, handler=handler):
+            async with scheduler.slot(id(server.request_context.session)):
+                return await handler(request)
+
+        server.request_handlers[request_type] = scheduled
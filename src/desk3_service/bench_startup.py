@@ -0,0 +1,72 @@
+"""
+Startup benchmark for the stdio server: spawns the server, sends an initialize
+request and measures the time until the initialize response arrives.
+
+Usage: PYTHONPATH=src python -m desk3_service.bench_startup [--runs 10]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+INITIALIZE_REQUEST = {
+    "jsonrpc": "2.0",
+    "id": 1,
+    "method": "initialize",
+    "params": {
+        "protocolVersion": "2025-06-18",
+        "capabilities": {},
+        "clientInfo": {"name": "bench_startup", "version": "0.1.0"},
+    },
+}
+
+
+def measure_once(command: list[str]) -> float:
+    """
+    Spawn the server once and return seconds until the initialize response.
+    """
+    env = dict(os.environ)
+    env.setdefault("PYTHONPATH", os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        command,
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        env=env,
+    )
+    try:
+        process.stdin.write((json.dumps(INITIALIZE_REQUEST) + "\n").encode())
+        process.stdin.flush()
+        while True:
+            line = process.stdout.readline()
+            if not line:
+                raise RuntimeError("Server exited before answering initialize")
+            message = json.loads(line)
+            if message.get("id") == INITIALIZE_REQUEST["id"]:
+                return time.perf_counter() - started
+    finally:
+        process.kill()
+        process.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure time to first initialize response of the stdio server")
+    parser.add_argument("--runs", type=int, default=10, help="Number of server spawns")
+    args = parser.parse_args()
+
+    command = [sys.executable, "-c", "from desk3_service import main; main()"]
+    # First spawn warms the bytecode cache and is not reported
+    measure_once(command)
+    samples = [measure_once(command) for _ in range(args.runs)]
+    print(f"runs={args.runs} "
+          f"min={min(samples) * 1000:.1f}ms "
+          f"median={statistics.median(samples) * 1000:.1f}ms "
+          f"max={max(samples) * 1000:.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,523 @@
+import asyncio
+import json
+import logging
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable
+from urllib.parse import urlparse
+
+
+class CacheBackend(ABC):
+    """
+    Key-value storage under the response cache. Values are bytes with a time to live.
+    Locks are used to elect a single replica to refresh an expired entry.
+    """
+
+    # Whether other processes see the entries; if not, the response cache keeps values only in process
+    shared = True
+
+    @abstractmethod
+    async def get(self, key: str) -> bytes | None:
+        ...
+
+    @abstractmethod
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        ...
+
+    @abstractmethod
+    async def delete(self, key: str) -> None:
+        ...
+
+    @abstractmethod
+    async def acquire_lock(self, key: str, owner: str, ttl: float) -> bool:
+        """
+        Set key to owner only if it does not exist. Returns True if the lock was taken.
+        """
+
+    @abstractmethod
+    async def release_lock(self, key: str, owner: str) -> None:
+        """
+        Delete key only if it is still held by owner, not by a replica that took it after it expired.
+        """
+
+    async def flush(self) -> None:
+        """
+        Persist pending writes. Backends that write through have nothing to do.
+        """
+
+    async def close(self) -> None:
+        pass
+
+
+class MemoryBackend(CacheBackend):
+    """
+    In-process backend, shared only by sessions of the same process.
+    """
+
+    shared = False
+
+    def __init__(self, max_entries: int = 4096):
+        self.max_entries = max_entries
+        self._entries: dict[str, tuple[float, bytes]] = {}
+
+    def _live(self, key: str) -> bytes | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if time.monotonic() >= expires_at:
+            del self._entries[key]
+            return None
+        return value
+
+    async def get(self, key: str) -> bytes | None:
+        return self._live(key)
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        if key not in self._entries and len(self._entries) >= self.max_entries:
+            now = time.monotonic()
+            for expired in [k for k, (expires_at, _) in self._entries.items() if expires_at <= now]:
+                del self._entries[expired]
+            if len(self._entries) >= self.max_entries:
+                # Drop the entry closest to expiry
+                del self._entries[min(self._entries, key=lambda k: self._entries[k][0])]
+        self._entries[key] = (time.monotonic() + ttl, value)
+
+    async def delete(self, key: str) -> None:
+        self._entries.pop(key, None)
+
+    async def acquire_lock(self, key: str, owner: str, ttl: float) -> bool:
+        if self._live(key) is not None:
+            return False
+        self._entries[key] = (time.monotonic() + ttl, owner.encode())
+        return True
+
+    async def release_lock(self, key: str, owner: str) -> None:
+        if self._live(key) == owner.encode():
+            del self._entries[key]
+
+
+class CacheServerError(RuntimeError):
+    """
+    Error reply (e.g. NOAUTH, WRONGPASS) or unexpected reply from the cache server.
+    """
+
+
+def _encode_command(*args: Any) -> bytes:
+    parts = [f"*{len(args)}\r\n".encode()]
+    for arg in args:
+        data = arg if isinstance(arg, bytes) else str(arg).encode()
+        parts.append(f"${len(data)}\r\n".encode() + data + b"\r\n")
+    return b"".join(parts)
+
+
+async def _read_reply(reader: asyncio.StreamReader) -> Any:
+    line = await reader.readline()
+    if not line:
+        raise ConnectionError("Connection closed by cache server")
+    kind, payload = line[:1], line[1:-2]
+    if kind == b"+":
+        return payload.decode()
+    if kind == b"-":
+        raise CacheServerError(f"Cache server error: {payload.decode()}")
+    if kind == b":":
+        return int(payload)
+    if kind == b"$":
+        length = int(payload)
+        if length < 0:
+            return None
+        data = await reader.readexactly(length + 2)
+        return data[:-2]
+    if kind == b"*":
+        return [await _read_reply(reader) for _ in range(int(payload))]
+    raise CacheServerError(f"Unexpected cache server reply: {line!r}")
+
+
+# Compare-and-delete, atomic on the server
+RELEASE_LOCK_SCRIPT = (
+    "if redis.call('get', KEYS[1]) == ARGV[1] then return redis.call('del', KEYS[1]) else return 0 end"
+)
+
+
+async def _roundtrip(connection: tuple[asyncio.StreamReader, asyncio.StreamWriter], *args: Any) -> Any:
+    reader, writer = connection
+    writer.write(_encode_command(*args))
+    await writer.drain()
+    return await _read_reply(reader)
+
+
+async def _close(connection: tuple[asyncio.StreamReader, asyncio.StreamWriter]) -> None:
+    writer = connection[1]
+    writer.close()
+    try:
+        await writer.wait_closed()
+    except OSError:
+        pass
+
+
+class RespBackend(CacheBackend):
+    """
+    Network backend speaking the Redis protocol (Redis, Valkey, KeyDB, or LocalKVServer),
+    so that replicas share fetched results. Commands run on a small pool of connections.
+    Connection errors and error replies are logged and treated as cache misses, and the backend is then
+    skipped for retry_after seconds, so the server keeps working without it and an
+    unreachable backend costs at most one timeout per window instead of one per call.
+    """
+
+    def __init__(self, url: str, timeout: float = 1.0, pool_size: int = 4, retry_after: float = 5.0):
+        """
+        :param url: redis://[:password@]host[:port][/db]
+        :param timeout: Seconds to wait for the cache server before treating a call as a miss
+        :param pool_size: Connections used concurrently at most
+        :param retry_after: Seconds the backend is skipped after a failure
+        """
+        parsed = urlparse(url)
+        self.host = parsed.hostname or "127.0.0.1"
+        self.port = parsed.port or 6379
+        self.password = parsed.password
+        self.db = int(parsed.path.lstrip("/") or 0)
+        self.timeout = timeout
+        self.retry_after = retry_after
+        self._slots = asyncio.Semaphore(pool_size)
+        self._idle: list[tuple[asyncio.StreamReader, asyncio.StreamWriter]] = []
+        self._open_until = 0.0
+
+    @property
+    def available(self) -> bool:
+        """
+        False while the backend is skipped after a failure.
+        """
+        return time.monotonic() >= self._open_until
+
+    async def _connect(self) -> tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+        connection = await asyncio.open_connection(self.host, self.port)
+        try:
+            if self.password:
+                await _roundtrip(connection, "AUTH", self.password)
+            if self.db:
+                await _roundtrip(connection, "SELECT", self.db)
+        except BaseException:
+            await _close(connection)
+            raise
+        return connection
+
+    async def execute(self, *args: Any) -> Any:
+        """
+        Run one command on a pooled connection. Returns None if the server is unavailable.
+        """
+        if not self.available:
+            return None
+        async with self._slots:
+            if not self.available:
+                # Failed while this call waited for a connection
+                return None
+            connection = self._idle.pop() if self._idle else None
+            try:
+                async with asyncio.timeout(self.timeout):
+                    if connection is None:
+                        connection = await self._connect()
+                    reply = await _roundtrip(connection, *args)
+            except (OSError, ConnectionError, TimeoutError, asyncio.IncompleteReadError, CacheServerError) as e:
+                # Error replies (e.g. a wrong password) are handled like an unreachable server
+                if self.available:
+                    logging.warning(
+                        f"Cache backend {self.host}:{self.port} unavailable, skipping it for {self.retry_after}s: {e!r}"
+                    )
+                self._open_until = time.monotonic() + self.retry_after
+                if connection is not None:
+                    await _close(connection)
+                await self._reset()
+                return None
+            except BaseException:
+                # Cancellation mid-command: the connection state is unknown, do not reuse it
+                if connection is not None:
+                    await _close(connection)
+                raise
+            self._idle.append(connection)
+            return reply
+
+    async def _reset(self) -> None:
+        idle, self._idle = self._idle, []
+        for connection in idle:
+            await _close(connection)
+
+    async def get(self, key: str) -> bytes | None:
+        return await self.execute("GET", key)
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        await self.execute("SET", key, value, "PX", max(int(ttl * 1000), 1))
+
+    async def delete(self, key: str) -> None:
+        await self.execute("DEL", key)
+
+    async def acquire_lock(self, key: str, owner: str, ttl: float) -> bool:
+        reply = await self.execute("SET", key, owner, "PX", max(int(ttl * 1000), 1), "NX")
+        # Without a reachable backend there is nobody to coordinate with
+        return reply == "OK" or not self.available
+
+    async def release_lock(self, key: str, owner: str) -> None:
+        await self.execute("EVAL", RELEASE_LOCK_SCRIPT, 1, key, owner)
+
+    async def close(self) -> None:
+        await self._reset()
+
+
+class LocalKVServer:
+    """
+    Minimal local stand-in for a Redis server (PING, AUTH, SELECT, GET, SET with PX/EX/NX, DEL,
+    and EVAL of RELEASE_LOCK_SCRIPT only),
+    for running several replicas or tests against RespBackend without external services.
+
+        async with LocalKVServer() as kv:
+            backend = RespBackend(kv.url)
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        self.host = host
+        self.port = port
+        self.store = MemoryBackend(max_entries=1_000_000)
+        self._server: asyncio.AbstractServer | None = None
+        self._connections: set[asyncio.StreamWriter] = set()
+        self._handlers: set[asyncio.Task] = set()
+
+    @property
+    def url(self) -> str:
+        return f"redis://{self.host}:{self.port}/0"
+
+    async def start(self) -> "LocalKVServer":
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            for writer in list(self._connections):
+                writer.close()
+            # Let connection handlers see the closed streams and return before the loop goes away
+            await asyncio.gather(*self._handlers, return_exceptions=True)
+            await self._server.wait_closed()
+            self._server = None
+
+    async def __aenter__(self) -> "LocalKVServer":
+        return await self.start()
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.stop()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self._connections.add(writer)
+        self._handlers.add(asyncio.current_task())
+        try:
+            while True:
+                try:
+                    command = await _read_reply(reader)
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    break
+                writer.write(await self._dispatch(command))
+                await writer.drain()
+        finally:
+            self._connections.discard(writer)
+            self._handlers.discard(asyncio.current_task())
+            writer.close()
+
+    async def _dispatch(self, command: list) -> bytes:
+        name = command[0].decode().upper() if command else ""
+        args = command[1:]
+        if name in ("PING", "AUTH", "SELECT"):
+            return b"+OK\r\n" if name != "PING" else b"+PONG\r\n"
+        if name == "GET":
+            value = await self.store.get(args[0].decode())
+            return b"$-1\r\n" if value is None else f"${len(value)}\r\n".encode() + value + b"\r\n"
+        if name == "DEL":
+            key = args[0].decode()
+            existed = await self.store.get(key) is not None
+            await self.store.delete(key)
+            return f":{int(existed)}\r\n".encode()
+        if name == "SET":
+            key, value = args[0].decode(), args[1]
+            options = [arg.decode().upper() for arg in args[2:]]
+            ttl = 365 * 24 * 3600.0
+            if "PX" in options:
+                ttl = int(options[options.index("PX") + 1]) / 1000
+            elif "EX" in options:
+                ttl = float(options[options.index("EX") + 1])
+            if "NX" in options:
+                taken = await self.store.acquire_lock(key, value.decode(), ttl)
+                return b"+OK\r\n" if taken else b"$-1\r\n"
+            await self.store.set(key, value, ttl)
+            return b"+OK\r\n"
+        if name == "EVAL" and args and args[0].decode() == RELEASE_LOCK_SCRIPT:
+            key, owner = args[2].decode(), args[3].decode()
+            held = await self.store.get(key) == owner.encode()
+            await self.store.release_lock(key, owner)
+            return f":{int(held)}\r\n".encode()
+        return f"-ERR unknown command '{name}'\r\n".encode()
+
+
+def create_backend(url: str | None) -> CacheBackend:
+    """
+    Create a cache backend from a URL: empty or memory:// for in-process, redis://host:port/db for shared.
+    """
+    if not url or url.startswith("memory:"):
+        return MemoryBackend()
+    if url.startswith("redis:"):
+        return RespBackend(url)
+    raise ValueError(f"Unsupported cache backend URL: {url}")
+
+
+# Upstream calls of the current task, counted only inside ResponseCache.counting_upstream()
+_upstream_calls: ContextVar[list[int] | None] = ContextVar("upstream_calls", default=None)
+
+
+class ResponseCache:
+    """
+    Caches upstream responses in a backend, with an in-process copy of decoded values.
+    Concurrent misses for a key are coalesced within the process, and across replicas a
+    lock in the backend elects the one replica that calls upstream; the others wait for
+    its result or serve the stale value.
+    """
+
+    # Expired values are kept, and served as stale, up to this many times their TTL
+    STALE_FACTOR = 5
+
+    def __init__(self, backend: CacheBackend, lock_ttl: float = 10.0, wait: float = 2.0, max_local: int = 1024):
+        """
+        :param backend: Storage backend
+        :param lock_ttl: Seconds a refresh lock is held at most
+        :param wait: Seconds a replica that lost the election waits for the leader's result
+        :param max_local: Maximum number of decoded values kept in process
+        """
+        self.backend = backend
+        self.lock_ttl = lock_ttl
+        self.wait = wait
+        self.max_local = max_local
+        self.owner = uuid.uuid4().hex
+        self._local: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self._inflight: dict[str, asyncio.Task] = {}
+        self.stats = {"hits": 0, "misses": 0, "stale": 0, "upstream": 0}
+
+    def _remember(self, key: str, entry: tuple[float, Any]) -> None:
+        self._local[key] = entry
+        self._local.move_to_end(key)
+        while len(self._local) > self.max_local:
+            self._local.popitem(last=False)
+
+    async def _read(self, key: str, ttl: float) -> tuple[float, Any] | None:
+        # Values older than this are not served, not even as stale
+        max_age = ttl * self.STALE_FACTOR
+        local = self._local.get(key)
+        if local is not None:
+            age = time.time() - local[0]
+            if age < ttl:
+                # Fresh in process: no backend round trip
+                self._local.move_to_end(key)
+                return local
+            if age >= max_age:
+                del self._local[key]
+                local = None
+        if not self.backend.shared:
+            return local
+        raw = await self.backend.get(key)
+        if raw is None:
+            return local
+        stored_at = json.loads(raw[:raw.index(b"\n")])
+        if time.time() - stored_at >= max_age or (local is not None and local[0] >= stored_at):
+            return local
+        entry = (stored_at, json.loads(raw[raw.index(b"\n") + 1:]))
+        self._remember(key, entry)
+        return entry
+
+    async def _write(self, key: str, value: Any, ttl: float) -> None:
+        stored_at = time.time()
+        self._remember(key, (stored_at, value))
+        if not self.backend.shared:
+            # The in-process copy is the only one needed
+            return
+        payload = json.dumps(stored_at).encode() + b"\n" + json.dumps(value).encode()
+        await self.backend.set(key, payload, ttl * self.STALE_FACTOR)
+
+    async def get_or_fetch(self, key: str, ttl: float, fetch: Callable[[], Any]) -> Any:
+        """
+        Return the cached value for key if younger than ttl, otherwise refresh it.
+        :param key: Cache key
+        :param ttl: Freshness in seconds
+        :param fetch: Blocking function calling upstream, run in a worker thread
+        :return: Response data
+        """
+        entry = await self._read(key, ttl)
+        if entry is not None and time.time() - entry[0] < ttl:
+            self.stats["hits"] += 1
+            return entry[1]
+        refresh = self._inflight.get(key)
+        if refresh is None:
+            refresh = asyncio.get_running_loop().create_task(self._refresh(key, ttl, fetch, entry))
+            self._inflight[key] = refresh
+            refresh.add_done_callback(lambda task: self._refreshed(key, task))
+        else:
+            self.stats["hits"] += 1
+        # The refresh runs in its own task: a cancelled caller does not cancel it for the others
+        return await asyncio.shield(refresh)
+
+    def _refreshed(self, key: str, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            # Retrieved here in case every caller was cancelled; avoids "never retrieved" warnings
+            task.exception()
+
+    async def _refresh(self, key: str, ttl: float, fetch: Callable[[], Any], stale: tuple[float, Any] | None) -> Any:
+        self.stats["misses"] += 1
+        lock_key = f"lock:{key}"
+        locked = await self.backend.acquire_lock(lock_key, self.owner, self.lock_ttl)
+        if not locked:
+            # Another replica is refreshing: wait for its result, then fall back to stale
+            deadline = time.monotonic() + self.wait
+            while time.monotonic() < deadline:
+                await asyncio.sleep(0.05)
+                entry = await self._read(key, ttl)
+                if entry is not None and time.time() - entry[0] < ttl:
+                    return entry[1]
+            if stale is not None:
+                self.stats["stale"] += 1
+                return stale[1]
+        try:
+            self.stats["upstream"] += 1
+            calls = _upstream_calls.get()
+            if calls is not None:
+                calls[0] += 1
+            value = await asyncio.to_thread(fetch)
+            await self._write(key, value, ttl)
+            return value
+        except Exception:
+            if stale is not None:
+                logging.warning(f"Upstream refresh failed for {key}, serving stale value")
+                self.stats["stale"] += 1
+                return stale[1]
+            raise
+        finally:
+            if locked:
+                await self.backend.release_lock(lock_key, self.owner)
+
+    @contextmanager
+    def counting_upstream(self):
+        """
+        Count the upstream calls the current task makes inside the block.
+        Yields a one-item list holding the count.
+        """
+        calls = [0]
+        token = _upstream_calls.set(calls)
+        try:
+            yield calls
+        finally:
+            _upstream_calls.reset(token)
+
+    async def flush(self) -> None:
+        await self.backend.flush()
+
+    async def close(self) -> None:
+        await self.backend.close()
@@ -0,0 +1,106 @@
+import json
+from typing import Any
+
+# Arguments holding comma separated symbol lists; order and case do not change the result
+SYMBOL_LIST_ARGUMENTS = ("symbol",)
+# Arguments holding chain id lists, as comma separated string (resources) or array (tools)
+CHAIN_LIST_ARGUMENTS = ("chainids",)
+# Arguments holding a single asset or currency code
+CODE_ARGUMENTS = ("quote", "token", "currency")
+
+# Resource path served by each tool, so a tool call and a resource read share one key
+TOOL_RESOURCE_PATHS = {
+    "get_suggest_gas": "/suggest",
+    "get_gas_table": "/table",
+    "get_exchange_rate": "/exchangeRate",
+    "get_mini_24hr": "/mini/24hr",
+    "get_top_movers": "/top-movers",
+    "get_token_price": "/price",
+    "get_token_circulating_supply": "/circulating",
+    "get_fear_greed_index": "/fear-greed",
+    "get_btc_trend": "/btc/trend",
+    "get_eth_trend": "/eth/trend",
+    "get_altcoin_season_index": "/altcoin/season",
+    "get_bitcoin_dominance": "/bitcoin/dominance",
+    "get_cycle_indicators": "/cycle/indicators",
+    "get_pi_cycle_top": "/pi-cycle-top",
+    "get_rainbow_chart": "/rainbow",
+    "get_puell_multiple": "/puell-multiple",
+    "get_cycles": "/cycles",
+    "get_changes": "/changes",
+    "get_market_calendar": "/calendar",
+}
+
+
+def canonical_symbols(value: Any) -> str | None:
+    """
+    Normalize a symbol list: upper-case, deduplicated, sorted, comma joined.
+    :param value: Comma separated symbols, e.g. "ethusdt, BTCUSDT,BTCUSDT"
+    :return: Canonical list, e.g. "BTCUSDT,ETHUSDT", or None if empty
+    """
+    if value is None:
+        return None
+    symbols = {part.strip().upper() for part in str(value).replace(" ", ",").split(",") if part.strip()}
+    return ",".join(sorted(symbols)) or None
+
+
+def _canonical_chains(value: Any) -> Any:
+    parts = value if isinstance(value, list) else str(value).split(",")
+    chains = sorted({str(part).strip() for part in parts if str(part).strip()}, key=lambda c: (len(c), c))
+    if not chains:
+        return None
+    return chains if isinstance(value, list) else ",".join(chains)
+
+
+def canonical_arguments(arguments: dict | None) -> dict[str, Any]:
+    """
+    Normalize tool arguments or resource query parameters so that equivalent requests are equal:
+    strings are stripped, empty values dropped, symbol and chain lists sorted and deduplicated,
+    and asset codes upper-cased.
+    :param arguments: Tool arguments or resource query parameters
+    :return: Canonical arguments
+    """
+    canonical = {}
+    for key, value in (arguments or {}).items():
+        if isinstance(value, str):
+            value = value.strip()
+        if value is None or value == "":
+            continue
+        if key in SYMBOL_LIST_ARGUMENTS:
+            value = canonical_symbols(value)
+        elif key in CHAIN_LIST_ARGUMENTS:
+            value = _canonical_chains(value)
+        elif key in CODE_ARGUMENTS and isinstance(value, str):
+            value = value.upper()
+        if value is not None:
+            canonical[key] = value
+    return canonical
+
+
+def _key_value(value: Any) -> Any:
+    # Tool arguments are typed, resource query parameters are strings: 10 and "10" are the same request,
+    # and so are the chain lists ["1", "56"] and "1,56"
+    if isinstance(value, list):
+        return ",".join(str(item) for item in value)
+    if isinstance(value, bool):
+        return str(value).lower()
+    return str(value)
+
+
+def request_key(name: str, arguments: dict | None, exclude: tuple[str, ...] = ()) -> str:
+    """
+    One key for a request, whether it came in as a tool call or a resource read.
+    :param name: Tool name or resource path
+    :param arguments: Tool arguments or resource query parameters
+    :param exclude: Arguments that do not select content, e.g. pagination
+    :return: Resource path followed by the sorted canonical arguments
+    """
+    path = TOOL_RESOURCE_PATHS.get(name, name)
+    selection = {
+        key: _key_value(value)
+        for key, value in canonical_arguments(arguments).items()
+        if key not in exclude
+    }
+    if not selection:
+        return path
+    return path + "?" + json.dumps(selection, sort_keys=True, separators=(",", ":"))
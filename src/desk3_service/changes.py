@@ -0,0 +1,211 @@
+import bisect
+import datetime
+import re
+import uuid
+from collections import deque
+from typing import Any
+
+from .delta import keyed_entries
+
+# Source name -> band bounds and labels applied to its index value
+SIGNAL_BANDS = {
+    "fear_greed": ([25, 47, 55, 76], ["Extreme Fear", "Fear", "Neutral", "Greed", "Extreme Greed"]),
+    "altcoin_season": ([25, 75], ["Bitcoin Season", "Neutral", "Altcoin Season"]),
+}
+
+CHANGES_SCHEMA_PROPERTIES = {
+    "since": {
+        "type": "string",
+        "description": "Token returned by the previous call. Omit on the first call to get a token",
+    },
+    "sources": {
+        "type": "string",
+        "description": "Comma separated sources to report: cycle_indicators, cycles, fear_greed, altcoin_season (default all)",
+    },
+    "min_change_pct": {
+        "type": "number",
+        "description": "Also report numeric values that moved by at least this percentage (default: only flips, band crossings and status changes)",
+        "minimum": 0,
+    },
+}
+
+# Leaf names carrying the index value that bands apply to
+_INDEX_RE = re.compile(r"(value|index|score)$", re.IGNORECASE)
+# Leaf names that change on every update without meaning anything
+_VOLATILE_RE = re.compile(r"(time|date|update|timestamp)", re.IGNORECASE)
+_BOOLEAN_STRINGS = {"true": True, "false": False, "yes": True, "no": False}
+# Unkeyed lists longer than this are treated as history / chart data and not tracked
+_MAX_LIST_SIGNALS = 50
+
+
+def _scalar(value: Any) -> Any:
+    if isinstance(value, str) and value.strip().lower() in _BOOLEAN_STRINGS:
+        return _BOOLEAN_STRINGS[value.strip().lower()]
+    return value
+
+
+def flatten_signals(data: Any, prefix: str = "") -> dict[str, Any]:
+    """
+    Flatten a response into path -> scalar signals. Row lists are keyed by symbol / Indicator
+    (or position), timestamps are dropped and long unkeyed lists (history) are skipped.
+    :param data: Response data
+    :param prefix: Path prefix
+    :return: Mapping of dotted path to scalar value
+    """
+    signals: dict[str, Any] = {}
+    if isinstance(data, dict) and isinstance(data.get("data"), (dict, list)) and not prefix:
+        data = data["data"]
+    if isinstance(data, list):
+        entries = keyed_entries(data)
+        if all(key.isdigit() for key in entries) and len(entries) > _MAX_LIST_SIGNALS:
+            return signals
+        items = entries.items()
+    elif isinstance(data, dict):
+        items = ((str(key), value) for key, value in data.items())
+    else:
+        return {prefix: _scalar(data)} if prefix else {"value": _scalar(data)}
+    for key, value in items:
+        if _VOLATILE_RE.search(key):
+            continue
+        path = f"{prefix}.{key}" if prefix else key
+        if isinstance(value, (dict, list)):
+            signals.update(flatten_signals(value, path))
+        else:
+            signals[path] = _scalar(value)
+    return signals
+
+
+def _number(value: Any) -> float | None:
+    if value is None or isinstance(value, bool):
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _band(source: str, value: float) -> str:
+    bounds, labels = SIGNAL_BANDS[source]
+    return labels[bisect.bisect_right(bounds, value)]
+
+
+def transitions(source: str, old: dict[str, Any], new: dict[str, Any]) -> list[dict[str, Any]]:
+    """
+    Transitions of one source between two flattened snapshots: boolean flips, band crossings
+    and status (text) changes.
+    """
+    found = []
+    for signal, value in new.items():
+        if signal not in old or old[signal] == value:
+            continue
+        previous = old[signal]
+        if isinstance(value, bool) or isinstance(previous, bool):
+            found.append({"source": source, "signal": signal, "type": "flip", "from": previous, "to": value})
+            continue
+        before, after = _number(previous), _number(value)
+        if before is None or after is None:
+            if isinstance(value, str) or isinstance(previous, str):
+                found.append({"source": source, "signal": signal, "type": "change", "from": previous, "to": value})
+            continue
+        if source in SIGNAL_BANDS and _INDEX_RE.search(signal.rsplit(".", 1)[-1]):
+            band_before, band_after = _band(source, before), _band(source, after)
+            if band_before != band_after:
+                found.append({
+                    "source": source, "signal": signal, "type": "band",
+                    "from": band_before, "to": band_after, "value_from": previous, "value_to": value,
+                })
+    return found
+
+
+def moves(source: str, old: dict[str, Any], new: dict[str, Any], min_change_pct: float) -> list[dict[str, Any]]:
+    """
+    Numeric signals of one source that moved by at least min_change_pct percent.
+    """
+    found = []
+    for signal, value in new.items():
+        before, after = _number(old.get(signal)), _number(value)
+        if not before or after is None:
+            continue
+        change_pct = (after - before) / abs(before) * 100
+        if abs(change_pct) >= min_change_pct:
+            found.append({
+                "source": source, "signal": signal, "type": "move",
+                "from": old[signal], "to": value, "change_pct": round(change_pct, 2),
+            })
+    return found
+
+
+class _Snapshot:
+    def __init__(self, token: str, signals: dict[str, dict[str, Any]]):
+        self.token = token
+        self.signals = signals
+        self.taken_at = datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds")
+
+
+class ChangeTracker:
+    """
+    Ring of the last few snapshots of flattened signals per source. A new snapshot is only
+    added when a signal changed, so the token stays the same while nothing moves.
+    """
+
+    def __init__(self, max_snapshots: int = 32):
+        self.max_snapshots = max_snapshots
+        # Tokens of an earlier process are never mistaken for ours
+        self.epoch = uuid.uuid4().hex[:8]
+        self.sequence = 0
+        self.snapshots: deque[_Snapshot] = deque(maxlen=max_snapshots)
+
+    def record(self, sources: dict[str, Any]) -> _Snapshot:
+        """
+        Record fresh source data. Sources missing from the mapping (failed fetches) keep their last signals.
+        :param sources: Mapping of source name to response data
+        :return: Latest snapshot
+        """
+        latest = self.snapshots[-1] if self.snapshots else None
+        signals = dict(latest.signals) if latest else {}
+        for source, data in sources.items():
+            signals[source] = flatten_signals(data)
+        if latest is not None and signals == latest.signals:
+            return latest
+        self.sequence += 1
+        snapshot = _Snapshot(f"{self.epoch}-{self.sequence}", signals)
+        self.snapshots.append(snapshot)
+        return snapshot
+
+    def changes_since(
+        self,
+        token: str | None,
+        sources: list[str] | None = None,
+        min_change_pct: float | None = None,
+    ) -> dict[str, Any]:
+        """
+        Transitions between the snapshot of token and the latest one. Flips, band crossings and
+        status changes are found step by step, so a flip and its reversal are both reported;
+        numeric moves are measured from the token's snapshot to the latest.
+        :param token: Token of an earlier answer, None for a first call
+        :param sources: Sources to report, all if None
+        :param min_change_pct: Also report numeric moves of at least this percentage
+        :return: Latest token and the transitions since token
+        """
+        latest = self.snapshots[-1]
+        snapshots = list(self.snapshots)
+        start = next((index for index, snapshot in enumerate(snapshots) if snapshot.token == token), None)
+        if start is None:
+            # First call, or token too old / from before a restart: start from now
+            return {"token": latest.token, "since": None, "reset": token is not None, "changes": []}
+        changes = []
+        for before, after in zip(snapshots[start:], snapshots[start + 1:]):
+            for source, signals in after.signals.items():
+                if sources and source not in sources:
+                    continue
+                for change in transitions(source, before.signals.get(source, {}), signals):
+                    change["at"] = after.taken_at
+                    changes.append(change)
+        if min_change_pct is not None and start < len(snapshots) - 1:
+            for source, signals in latest.signals.items():
+                if sources and source not in sources:
+                    continue
+                for change in moves(source, snapshots[start].signals.get(source, {}), signals, min_change_pct):
+                    change["at"] = latest.taken_at
+                    changes.append(change)
+        return {"token": latest.token, "since": token, "reset": False, "changes": changes}
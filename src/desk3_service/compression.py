@@ -0,0 +1,226 @@
+import os
+import zlib
+from typing import Any
+
+from starlette.datastructures import Headers, MutableHeaders
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Content types worth compressing; SSE streams are compressed event by event
+COMPRESSIBLE_TYPES = ("text/", "application/json", "application/javascript", "application/xml")
+
+
+def available_encodings() -> tuple[str, ...]:
+    """
+    Supported content codings in server preference order.
+    """
+    encodings = []
+    if zstandard is not None:
+        encodings.append("zstd")
+    if brotli is not None:
+        encodings.append("br")
+    encodings.append("gzip")
+    return tuple(encodings)
+
+
+def negotiate_encoding(accept_encoding: str, encodings: tuple[str, ...]) -> str | None:
+    """
+    Pick the content coding for an Accept-Encoding header.
+    The highest q-value wins; ties go to the earlier entry of encodings.
+    :param accept_encoding: Accept-Encoding request header
+    :param encodings: Supported encodings in preference order
+    :return: Chosen encoding, or None to send the body as is
+    """
+    weights: dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        weights[name] = q
+    best, best_q = None, 0.0
+    for encoding in encodings:
+        q = weights.get(encoding, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+class StreamCompressor:
+    """
+    Incremental compressor; every chunk is flushed so it can be decoded on arrival.
+    """
+
+    def __init__(self, encoding: str, level: int | None = None):
+        self.encoding = encoding
+        if encoding == "zstd":
+            self._compressor = zstandard.ZstdCompressor(level=level or 3).compressobj()
+        elif encoding == "br":
+            self._compressor = brotli.Compressor(quality=level or 5)
+        else:
+            self._compressor = zlib.compressobj(level or 6, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        if self.encoding == "zstd":
+            return self._compressor.compress(data) + self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+        if self.encoding == "br":
+            return self._compressor.process(data) + self._compressor.flush()
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        if self.encoding == "zstd":
+            return self._compressor.flush()
+        if self.encoding == "br":
+            return self._compressor.finish()
+        return self._compressor.flush()
+
+
+def compress(body: bytes, encoding: str, level: int | None = None) -> bytes:
+    """
+    Compress a complete body.
+    """
+    if encoding == "zstd":
+        return zstandard.ZstdCompressor(level=level or 3).compress(body)
+    if encoding == "br":
+        return brotli.compress(body, quality=level or 5)
+    compressor = zlib.compressobj(level or 6, zlib.DEFLATED, 31)
+    return compressor.compress(body) + compressor.flush()
+
+
+class Compression:
+    """
+    Compression settings and counters shared by the middleware.
+    """
+
+    def __init__(self, minimum_size: int = 1024):
+        """
+        :param minimum_size: Complete bodies smaller than this many bytes are sent as is
+        """
+        self.minimum_size = minimum_size
+        self.encodings = available_encodings()
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.responses: dict[str, int] = {}
+
+    def record(self, encoding: str | None, size: int, compressed_size: int) -> None:
+        if encoding is not None:
+            self.responses[encoding] = self.responses.get(encoding, 0) + 1
+        self.bytes_in += size
+        self.bytes_out += compressed_size
+
+    def metrics(self) -> dict[str, Any]:
+        return {
+            "encodings": list(self.encodings),
+            "responses": dict(self.responses),
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+            "ratio": self.bytes_out / self.bytes_in if self.bytes_in else None,
+        }
+
+
+class CompressionMiddleware:
+    """
+    ASGI middleware negotiating zstd, br (when the optional packages are installed) or gzip.
+    Complete bodies below minimum_size are sent as is, larger ones are compressed whole.
+    Streamed bodies such as SSE are compressed with a flush after every chunk, so events
+    are not held back.
+    """
+
+    def __init__(self, app, compression: Compression | None = None):
+        self.app = app
+        self.compression = compression or Compression()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        compression = self.compression
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""), compression.encodings)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message: dict[str, Any] | None = None
+        compressor: StreamCompressor | None = None
+        passthrough = False
+
+        async def send_compressed(message):
+            nonlocal start_message, compressor, passthrough
+            if passthrough:
+                await send(message)
+                return
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message["headers"])
+                content_type = headers.get("content-type", "")
+                if (
+                    "content-encoding" in headers
+                    or message["status"] in (204, 304)
+                    or not content_type.startswith(COMPRESSIBLE_TYPES)
+                ):
+                    passthrough = True
+                    await send(message)
+                    return
+                # Hold the start until the first body chunk shows whether the body is streamed
+                start_message = message
+                return
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if compressor is None:
+                headers = MutableHeaders(raw=start_message["headers"])
+                start, start_message = start_message, None
+                if not more_body:
+                    passthrough = True
+                    if len(body) < compression.minimum_size:
+                        await send(start)
+                        await send(message)
+                        return
+                    compressed = compress(body, encoding)
+                    compression.record(encoding, len(body), len(compressed))
+                    headers["Content-Encoding"] = encoding
+                    headers["Content-Length"] = str(len(compressed))
+                    headers.add_vary_header("Accept-Encoding")
+                    await send(start)
+                    await send({"type": "http.response.body", "body": compressed})
+                    return
+                compressor = StreamCompressor(encoding)
+                compression.record(encoding, 0, 0)
+                headers["Content-Encoding"] = encoding
+                headers.add_vary_header("Accept-Encoding")
+                if "content-length" in headers:
+                    del headers["Content-Length"]
+                await send(start)
+
+            compressed = compressor.compress(body) if body else b""
+            if not more_body:
+                compressed += compressor.finish()
+                passthrough = True
+            compression.record(None, len(body), len(compressed))
+            await send({"type": "http.response.body", "body": compressed, "more_body": more_body})
+
+        await self.app(scope, receive, send_compressed)
+
+
+def compression_from_env() -> Compression:
+    return Compression(
+        minimum_size=int(os.getenv("DESK3_COMPRESS_MIN_SIZE", "1024")),
+    )
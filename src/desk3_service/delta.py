@@ -0,0 +1,185 @@
+import hashlib
+import json
+import weakref
+from collections import OrderedDict
+from typing import Any
+
+from .canonical import request_key
+from .pagination import rows_of
+
+DELTA_SCHEMA_PROPERTIES = {
+    "delta": {
+        "type": "boolean",
+        "description": "Return only entries changed since the version last delivered to this session (or since), with a version token. Omit to get the full document",
+    },
+    "since": {
+        "type": "string",
+        "description": "Version token of a previous response to diff against, instead of the last version delivered to this session. Implies delta unless delta is false",
+    },
+}
+
+# Arguments that change how a document is delivered, not which document it is
+DELIVERY_ARGUMENTS = ("delta", "since", "cursor", "page_size")
+
+# Row fields tried, in order, as the key identifying a row across versions
+_ROW_KEY_FIELDS = ("symbol", "Indicator", "indicator", "name", "id")
+
+
+def wants_delta(arguments: dict | None) -> bool:
+    """
+    Whether tool arguments or resource query parameters ask for delta mode.
+    An explicit delta decides; without it, a since token turns delta mode on.
+    """
+    if not arguments:
+        return False
+    value = arguments.get("delta")
+    if value is None:
+        return bool(arguments.get("since"))
+    if isinstance(value, str):
+        return value.strip().lower() in ("1", "true", "yes")
+    return bool(value)
+
+
+def document_key(name: str, arguments: dict | None) -> str:
+    """
+    Identify a document by resource path or tool name plus the arguments selecting its content.
+    """
+    return request_key(name, arguments, exclude=DELIVERY_ARGUMENTS)
+
+
+def _row_key_field(rows: list) -> str | None:
+    sample = next((row for row in rows if isinstance(row, dict)), None)
+    if sample is None:
+        return None
+    for field in _ROW_KEY_FIELDS:
+        if field in sample:
+            return field
+    return None
+
+
+def keyed_entries(data: Any) -> dict[str, Any]:
+    """
+    Map a document to keyed entries: rows by their key field (or position), or top-level fields.
+    """
+    rows = rows_of(data)
+    if rows is not None:
+        field = _row_key_field(rows)
+        entries = {}
+        for position, row in enumerate(rows):
+            key = row.get(field) if field and isinstance(row, dict) else None
+            entries[str(key if key is not None else position)] = row
+        return entries
+    if isinstance(data, dict):
+        return {str(key): value for key, value in data.items()}
+    return {"": data}
+
+
+def diff_entries(old: dict[str, Any], new: dict[str, Any]) -> dict[str, Any]:
+    """
+    Keyed diff of two entry maps. Changed dict rows only carry their changed fields.
+    :return: Mapping with added, changed and removed entries
+    """
+    added, changed = {}, {}
+    for key, value in new.items():
+        if key not in old:
+            added[key] = value
+        elif old[key] != value:
+            previous = old[key]
+            if isinstance(value, dict) and isinstance(previous, dict):
+                fields = {field: item for field, item in value.items() if previous.get(field) != item}
+                for field in previous.keys() - value.keys():
+                    fields[field] = None
+                changed[key] = fields
+            else:
+                changed[key] = value
+    removed = [key for key in old if key not in new]
+    return {"added": added, "changed": changed, "removed": removed}
+
+
+class _Version:
+    def __init__(self, token: str, data: Any):
+        self.token = token
+        self.data = data
+        self._entries: dict[str, Any] | None = None
+
+    @property
+    def entries(self) -> dict[str, Any]:
+        if self._entries is None:
+            self._entries = keyed_entries(self.data)
+        return self._entries
+
+
+class DeltaTracker:
+    """
+    Keeps the last few versions of each document and the version last delivered
+    to each session, and turns a new version into a delta against either.
+    """
+
+    def __init__(self, max_versions: int = 8, max_documents: int = 256):
+        """
+        :param max_versions: Versions kept per document for diffing
+        :param max_documents: Documents tracked before the least recently used is dropped
+        """
+        self.max_versions = max_versions
+        self.max_documents = max_documents
+        self._documents: OrderedDict[str, OrderedDict[str, _Version]] = OrderedDict()
+        self._delivered: weakref.WeakKeyDictionary[Any, dict[str, str]] = weakref.WeakKeyDictionary()
+
+    def _record(self, key: str, data: Any) -> _Version:
+        versions = self._documents.get(key)
+        if versions is None:
+            versions = OrderedDict()
+            self._documents[key] = versions
+            while len(self._documents) > self.max_documents:
+                self._documents.popitem(last=False)
+        self._documents.move_to_end(key)
+        if versions:
+            latest = next(reversed(versions.values()))
+            if latest.data is data:
+                # Same cached response object, no need to hash it again
+                return latest
+        text = json.dumps(data, sort_keys=True, separators=(",", ":"), default=str)
+        token = hashlib.blake2b(text.encode(), digest_size=8).hexdigest()
+        version = versions.pop(token, None) or _Version(token, data)
+        versions[token] = version
+        while len(versions) > self.max_versions:
+            versions.popitem(last=False)
+        return version
+
+    def deliver(self, key: str, data: Any, session: Any = None, delta: bool = False, since: str | None = None) -> Any:
+        """
+        Record data as delivered to session and return what to send.
+        :param key: Document key, see document_key
+        :param data: Full document
+        :param session: Session object the document goes to, None if unknown
+        :param delta: Return a delta instead of the full document
+        :param since: Version token to diff against instead of the session's last delivered version
+        :return: The full document, or a delta with version/base and added/changed/removed entries
+        """
+        delivered = None
+        if session is not None:
+            try:
+                delivered = self._delivered.get(session)
+                if delivered is None and delta:
+                    delivered = self._delivered.setdefault(session, {})
+            except TypeError:
+                delivered = None
+        if not delta and delivered is None:
+            # Sessions that never asked for a delta pay nothing for tracking
+            return data
+        version = self._record(key, data)
+        base_token = since or (delivered.get(key) if delivered is not None else None)
+        if delivered is not None:
+            delivered[key] = version.token
+        if not delta:
+            return data
+        base = self._documents[key].get(base_token) if base_token else None
+        if base is None:
+            # Nothing to diff against: first delta read or base version no longer kept
+            return {"version": version.token, "base": None, "full": True, "data": data}
+        return {
+            "version": version.token,
+            "base": base.token,
+            "full": False,
+            **diff_entries(base.entries, version.entries),
+        }
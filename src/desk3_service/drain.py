@@ -0,0 +1,168 @@
+import asyncio
+import logging
+import os
+import random
+import signal
+import time
+from contextlib import asynccontextmanager
+from typing import Any, Awaitable, Callable
+
+from starlette.responses import JSONResponse
+
+from .admission import AdmissionController, FairScheduler
+
+
+class Drainer:
+    """
+    Lifecycle of the HTTP server: warm up before reporting ready, and on SIGTERM drain
+    instead of dropping sessions. Draining marks the server not ready, rejects new sessions,
+    waits up to timeout seconds for in-flight requests, runs the shutdown steps (flush
+    caches, stop background tasks) and only then hands the signal on to uvicorn, which
+    closes the remaining SSE streams. Connections to shared backends are closed last,
+    when the application shuts down.
+    """
+
+    def __init__(
+        self,
+        admission: AdmissionController,
+        scheduler: FairScheduler,
+        warm_up: Callable[[], Awaitable[Any]] | None = None,
+        shutdown: Callable[[], Awaitable[Any]] | None = None,
+        close: Callable[[], Awaitable[Any]] | None = None,
+        timeout: float = 25.0,
+        warm_up_timeout: float = 10.0,
+    ):
+        """
+        :param admission: Session admission controller, closed when draining starts
+        :param scheduler: Request scheduler whose in-flight requests are waited for
+        :param warm_up: Coroutine function run at startup before the server reports ready
+        :param shutdown: Coroutine function run once in-flight requests are done
+        :param close: Coroutine function run when the application shuts down, after the shutdown steps
+        :param timeout: Seconds to wait for in-flight requests
+        :param warm_up_timeout: Seconds the warm up may delay readiness
+        """
+        self.admission = admission
+        self.scheduler = scheduler
+        self.warm_up = warm_up
+        self.shutdown = shutdown
+        self.close = close
+        self.timeout = timeout
+        self.warm_up_timeout = warm_up_timeout
+        self.state = "starting"
+        self._drain_task: asyncio.Task | None = None
+        self._shut_down = False
+
+    @property
+    def ready(self) -> bool:
+        return self.state == "ready"
+
+    async def start(self) -> None:
+        if self.warm_up is not None:
+            try:
+                await asyncio.wait_for(self.warm_up(), self.warm_up_timeout)
+            except Exception as e:
+                # A cold cache is better than not serving at all
+                logging.warning(f"Warm up did not complete: {e!r}")
+        if self.state == "starting":
+            self.state = "ready"
+
+    async def drain(self) -> None:
+        """
+        Stop admitting sessions, wait for in-flight requests, then run the shutdown steps.
+        """
+        self.state = "draining"
+        await self.admission.close()
+        deadline = time.monotonic() + self.timeout
+        while time.monotonic() < deadline:
+            metrics = self.scheduler.metrics()
+            if metrics["active"] == 0 and metrics["queued"] == 0:
+                break
+            await asyncio.sleep(0.1)
+        else:
+            logging.warning(f"Drain timeout: {self.scheduler.metrics()['active']} requests still in flight")
+        await self._run_shutdown()
+        self.state = "drained"
+
+    async def _run_shutdown(self) -> None:
+        if self._shut_down or self.shutdown is None:
+            return
+        self._shut_down = True
+        try:
+            await self.shutdown()
+        except Exception as e:
+            logging.error(f"Shutdown failed: {e}")
+
+    def install_signal_handler(self, sig: int = signal.SIGTERM) -> None:
+        """
+        Chain a drain in front of the current handler of sig (uvicorn's).
+        A second signal while draining is passed on immediately.
+        """
+        loop = asyncio.get_running_loop()
+        previous = signal.getsignal(sig)
+
+        def hand_on() -> None:
+            signal.signal(sig, previous)
+            signal.raise_signal(sig)
+
+        async def drain_then_exit() -> None:
+            try:
+                await self.drain()
+            finally:
+                hand_on()
+
+        def handle(signum, frame) -> None:
+            if self._drain_task is not None:
+                hand_on()
+                return
+            logging.info(f"Received signal {signum}, draining")
+            self._drain_task = loop.create_task(drain_then_exit())
+
+        signal.signal(sig, lambda signum, frame: loop.call_soon_threadsafe(handle, signum, frame))
+
+    @asynccontextmanager
+    async def lifespan(self, app):
+        self.install_signal_handler()
+        start_task = asyncio.get_running_loop().create_task(self.start())
+        try:
+            yield
+        finally:
+            start_task.cancel()
+            # Shutdown without a drain (e.g. SIGINT) still flushes caches and stops background tasks
+            await self._run_shutdown()
+            if self.close is not None:
+                try:
+                    await self.close()
+                except Exception as e:
+                    logging.error(f"Close failed: {e}")
+
+    async def handle_healthz(self, request):
+        return JSONResponse({"status": "ok", "state": self.state})
+
+    async def handle_readyz(self, request):
+        return JSONResponse({"status": self.state}, status_code=200 if self.ready else 503)
+
+    def retry_after(self) -> str:
+        """
+        Retry-After for rejected sessions; spread out while draining so clients do not reconnect all at once.
+        """
+        if self.state in ("draining", "drained"):
+            return str(random.randint(1, 10))
+        return "5"
+
+
+def drainer_from_env(
+    admission: AdmissionController,
+    scheduler: FairScheduler,
+    warm_up: Callable[[], Awaitable[Any]] | None = None,
+    shutdown: Callable[[], Awaitable[Any]] | None = None,
+    close: Callable[[], Awaitable[Any]] | None = None,
+) -> Drainer:
+    return Drainer(
+        admission,
+        scheduler,
+        warm_up=warm_up,
+        shutdown=shutdown,
+        close=close,
+        timeout=float(os.getenv("DESK3_DRAIN_TIMEOUT", "25")),
+        warm_up_timeout=float(os.getenv("DESK3_WARMUP_TIMEOUT", "10")),
+    )
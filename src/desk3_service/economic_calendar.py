@@ -0,0 +1,331 @@
+import asyncio
+import bisect
+import datetime
+import logging
+import re
+import time
+from typing import Any, Awaitable, Callable
+
+_DATE_RE = re.compile(r"^(\d{4})-(\d{2})-(\d{2})")
+_DATE_FIELDS = ("date", "day", "time", "datetime", "timestamp")
+_EVENT_LIST_FIELDS = ("events", "list", "data", "items")
+_IMPORTANCE_FIELDS = ("importance", "star", "stars", "level")
+_COUNTRY_FIELDS = ("country", "countryCode", "region")
+_CATEGORY_FIELDS = ("category", "type")
+
+# Largest start/end range accepted by a single query
+MAX_RANGE_MONTHS = 12
+
+CALENDAR_QUERY_SCHEMA_PROPERTIES = {
+    "start": {
+        "type": "string",
+        "description": "Only events on or after this day, format YYYY-MM-DD",
+        "pattern": "^[0-9]{4}-[0-9]{2}-[0-9]{2}$",
+    },
+    "end": {
+        "type": "string",
+        "description": "Only events on or before this day, format YYYY-MM-DD",
+        "pattern": "^[0-9]{4}-[0-9]{2}-[0-9]{2}$",
+    },
+    "next": {
+        "type": "integer",
+        "description": "Return the next N upcoming events (from start, or today)",
+        "minimum": 1,
+        "maximum": 200,
+    },
+    "country": {
+        "type": "string",
+        "description": "Comma separated countries or regions to include (case-insensitive), e.g. US,CN",
+    },
+    "min_importance": {
+        "type": "integer",
+        "description": "Only events with at least this importance / star level",
+        "minimum": 0,
+    },
+    "category": {
+        "type": "string",
+        "description": "Only events whose category/type contains this text (case-insensitive)",
+    },
+}
+
+
+def _first(row: dict, fields: tuple[str, ...]) -> Any:
+    for field in fields:
+        if row.get(field) not in (None, ""):
+            return row[field]
+    return None
+
+
+def _to_day(value: Any, month: str) -> str | None:
+    """
+    Normalize a date, datetime, timestamp or day-of-month value to YYYY-MM-DD.
+    """
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        if value > 10_000_000_000:
+            value = value / 1000
+        if value > 31:
+            return datetime.datetime.fromtimestamp(value, datetime.timezone.utc).strftime("%Y-%m-%d")
+        return f"{month}-{int(value):02d}"
+    if isinstance(value, str):
+        match = _DATE_RE.match(value.strip())
+        if match:
+            return "-".join(match.groups())
+        if value.strip().isdigit():
+            return _to_day(int(value.strip()), month)
+    return None
+
+
+def _number(value: Any) -> float | None:
+    if value is None or isinstance(value, bool):
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_month(data: Any, month: str) -> list[dict[str, Any]]:
+    """
+    Flatten a month of the economic calendar into events carrying a normalized "date".
+    Accepts events grouped by day (mapping or list of day groups) or a flat event list.
+    :param data: get_market_calendar response
+    :param month: Month in format YYYY-MM
+    :return: Events sorted by date
+    """
+    if isinstance(data, dict) and isinstance(data.get("data"), (list, dict)):
+        data = data["data"]
+
+    events = []
+
+    def add(event: Any, day: str | None) -> None:
+        if not isinstance(event, dict):
+            return
+        event_day = _to_day(_first(event, _DATE_FIELDS), month) or day
+        if event_day:
+            events.append({**event, "date": event_day})
+
+    if isinstance(data, dict):
+        for key, value in data.items():
+            day = _to_day(key, month)
+            for event in value if isinstance(value, list) else [value]:
+                add(event, day)
+    elif isinstance(data, list):
+        for item in data:
+            nested = _first(item, _EVENT_LIST_FIELDS) if isinstance(item, dict) else None
+            if isinstance(nested, list):
+                day = _to_day(_first(item, _DATE_FIELDS), month)
+                for event in nested:
+                    add(event, day)
+            else:
+                add(item, None)
+    events.sort(key=lambda event: (event["date"], str(event.get("time", ""))))
+    return events
+
+
+def _month_number(month: str) -> int:
+    return int(month[:4]) * 12 + int(month[5:7]) - 1
+
+
+class MonthIndex:
+    """
+    One month of events sorted by date, with country and importance indexes.
+    """
+
+    def __init__(self, raw: Any, events: list[dict[str, Any]], fetched_at: float, final: bool):
+        """
+        :param raw: Upstream response for the month
+        :param events: Flattened events sorted by date
+        :param fetched_at: Monotonic fetch time
+        :param final: Whether the month was already over when fetched, so it can never change
+        """
+        self.raw = raw
+        self.final = final
+        self.events = events
+        self.dates = [event["date"] for event in events]
+        self.fetched_at = fetched_at
+        self.by_country: dict[str, list[int]] = {}
+        self.importance: list[float | None] = []
+        for position, event in enumerate(events):
+            country = _first(event, _COUNTRY_FIELDS)
+            if country:
+                self.by_country.setdefault(str(country).lower(), []).append(position)
+            self.importance.append(_number(_first(event, _IMPORTANCE_FIELDS)))
+
+    def positions(self, start: str | None, end: str | None, countries: list[str] | None) -> list[int]:
+        low = bisect.bisect_left(self.dates, start) if start else 0
+        high = bisect.bisect_right(self.dates, end) if end else len(self.dates)
+        if not countries:
+            return list(range(low, high))
+        positions = sorted(
+            position
+            for country in countries
+            for position in self.by_country.get(country, [])
+            if low <= position < high
+        )
+        return positions
+
+
+class CalendarStore:
+    """
+    Caches economic calendar months and answers date range / next-N / filter queries.
+    Months that were already over when fetched are immutable and cached for the life of
+    the process; the current and future months are refreshed after ttl seconds.
+    """
+
+    def __init__(self, fetch: Callable[[str], Awaitable[Any]], ttl: float = 3600.0, max_months: int = 36):
+        """
+        :param fetch: Coroutine function returning the calendar response for a YYYY-MM month
+        :param ttl: Seconds before the current or a future month is fetched again
+        :param max_months: Maximum number of months kept in memory
+        """
+        self.fetch = fetch
+        self.ttl = ttl
+        self.max_months = max_months
+        self.months: dict[str, MonthIndex] = {}
+        self._loading: dict[str, asyncio.Task] = {}
+        # Background prefetches, referenced so they are not garbage collected mid-flight
+        self._tasks: set[asyncio.Task] = set()
+
+    @staticmethod
+    def current_month() -> str:
+        return datetime.date.today().strftime("%Y-%m")
+
+    @staticmethod
+    def next_month(month: str) -> str:
+        year, number = int(month[:4]), int(month[5:7])
+        return f"{year + number // 12}-{number % 12 + 1:02d}"
+
+    def _is_fresh(self, index: MonthIndex) -> bool:
+        if index.final:
+            return True
+        return time.monotonic() - index.fetched_at <= self.ttl
+
+    async def month(self, month: str) -> MonthIndex:
+        """
+        Return the indexed events of a month, fetching it at most once concurrently.
+        :param month: Month in format YYYY-MM
+        :return: Month index
+        """
+        index = self.months.get(month)
+        if index is not None and self._is_fresh(index):
+            return index
+        loading = self._loading.get(month)
+        if loading is None:
+            loading = asyncio.get_running_loop().create_task(self._load(month))
+            self._loading[month] = loading
+            loading.add_done_callback(lambda task: self._loaded(month, task))
+        # The load runs in its own task: a cancelled caller does not cancel it for the others
+        return await asyncio.shield(loading)
+
+    async def _load(self, month: str) -> MonthIndex:
+        final = month < self.current_month()
+        raw = await self.fetch(month)
+        index = MonthIndex(raw, parse_month(raw, month), time.monotonic(), final)
+        self.months[month] = index
+        while len(self.months) > self.max_months:
+            # Evict the month furthest from the current one
+            current = _month_number(self.current_month())
+            furthest = max(self.months, key=lambda key: abs(_month_number(key) - current))
+            del self.months[furthest]
+        return index
+
+    def _loaded(self, month: str, task: asyncio.Task) -> None:
+        if self._loading.get(month) is task:
+            del self._loading[month]
+        if not task.cancelled():
+            # Retrieved here in case every caller was cancelled; avoids "never retrieved" warnings
+            task.exception()
+
+    def prefetch(self, month: str) -> None:
+        """
+        Load a month in the background if it is not already cached.
+        """
+        index = self.months.get(month)
+        if (index is not None and self._is_fresh(index)) or month in self._loading:
+            return
+
+        async def load() -> None:
+            try:
+                await self.month(month)
+            except Exception as e:
+                logging.warning(f"Calendar prefetch failed for {month}: {e}")
+
+        task = asyncio.get_running_loop().create_task(load())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def _filter(
+        self,
+        index: MonthIndex,
+        start: str | None,
+        end: str | None,
+        countries: list[str] | None,
+        min_importance: float | None,
+        category: str | None,
+    ) -> list[dict[str, Any]]:
+        events = []
+        for position in index.positions(start, end, countries):
+            if min_importance is not None:
+                importance = index.importance[position]
+                if importance is None or importance < min_importance:
+                    continue
+            event = index.events[position]
+            if category:
+                value = _first(event, _CATEGORY_FIELDS)
+                if value is None or category not in str(value).lower():
+                    continue
+            events.append(event)
+        return events
+
+    async def query(
+        self,
+        start: str | None = None,
+        end: str | None = None,
+        next: int | None = None,
+        country: str | None = None,
+        min_importance: float | None = None,
+        category: str | None = None,
+        max_months: int = 3,
+    ) -> list[dict[str, Any]]:
+        """
+        Query events by date range, next-N, country, importance and category.
+        :param start: First day YYYY-MM-DD, defaults to today for next-N queries
+        :param end: Last day YYYY-MM-DD
+        :param next: Return only the first N matching events from start
+        :param country: Comma separated countries or regions
+        :param min_importance: Minimum importance / star level
+        :param category: Text contained in the event category/type
+        :param max_months: Months scanned for next-N queries without an end date
+        :return: Matching events sorted by date
+        """
+        if next and not start:
+            start = datetime.date.today().strftime("%Y-%m-%d")
+        if start and end and start > end:
+            raise ValueError("start must not be after end")
+        if start and end and _month_number(end[:7]) - _month_number(start[:7]) >= MAX_RANGE_MONTHS:
+            raise ValueError(f"Date range must not span more than {MAX_RANGE_MONTHS} months")
+        countries = [c.strip().lower() for c in country.split(",") if c.strip()] if country else None
+        category = category.lower() if category else None
+
+        month = start[:7] if start else (end[:7] if end else self.current_month())
+        last_month = end[:7] if end else None
+        if last_month is None and not next:
+            last_month = month
+        scanned = 0
+        events: list[dict[str, Any]] = []
+        while True:
+            index = await self.month(month)
+            scanned += 1
+            following = self.next_month(month)
+            if last_month is None or following <= last_month:
+                # Warm the following month while this one is being filtered
+                self.prefetch(following)
+            events.extend(self._filter(index, start, end, countries, min_importance, category))
+            if next and len(events) >= next:
+                return events[:next]
+            if last_month is not None and following > last_month:
+                break
+            if last_month is None and scanned >= max_months:
+                break
+            month = following
+        return events[:next] if next else events
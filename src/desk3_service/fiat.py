@@ -0,0 +1,173 @@
+import time
+from typing import Any
+
+# Quote assets treated as 1 USD when pricing tokens
+USD_QUOTES = ("USDT", "USD")
+
+_CODE_FIELDS = ("currency", "code", "symbol", "name")
+_RATE_FIELDS = ("rate", "value", "price")
+_PRICE_FIELDS = ("price", "lastPrice", "close")
+
+
+def _number(value: Any) -> float | None:
+    if value is None or isinstance(value, bool):
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _first(row: dict, fields: tuple[str, ...]) -> Any:
+    for field in fields:
+        if row.get(field) is not None:
+            return row[field]
+    return None
+
+
+def _unwrap(data: Any) -> Any:
+    if isinstance(data, dict) and isinstance(data.get("data"), (list, dict)):
+        return data["data"]
+    return data
+
+
+def parse_rates(data: Any) -> dict[str, float]:
+    """
+    Parse an exchange rate response into a currency -> rate mapping.
+    Accepts a {"EUR": 0.92, ...} mapping or a list of rows with currency/code and rate/value fields.
+    :param data: get_exchange_rate response
+    :return: Mapping of upper-case currency code to units per 1 USD
+    """
+    data = _unwrap(data)
+    rates: dict[str, float] = {}
+    if isinstance(data, dict):
+        for code, value in data.items():
+            rate = _number(_first(value, _RATE_FIELDS) if isinstance(value, dict) else value)
+            if rate:
+                rates[str(code).upper()] = rate
+    elif isinstance(data, list):
+        for row in data:
+            if not isinstance(row, dict):
+                continue
+            code, rate = _first(row, _CODE_FIELDS), _number(_first(row, _RATE_FIELDS))
+            if code and rate:
+                rates[str(code).upper()] = rate
+    rates.setdefault("USD", 1.0)
+    return rates
+
+
+def parse_prices(data: Any) -> dict[str, float]:
+    """
+    Parse a token price response into a symbol -> price mapping.
+    Accepts a list of rows with symbol and price/lastPrice, a single such row, or a {"BTCUSDT": price} mapping.
+    :param data: get_token_price or get_mini_24hr response
+    :return: Mapping of upper-case trading pair to price
+    """
+    data = _unwrap(data)
+    if isinstance(data, dict) and "symbol" in data:
+        data = [data]
+    prices: dict[str, float] = {}
+    if isinstance(data, dict):
+        for symbol, value in data.items():
+            price = _number(_first(value, _PRICE_FIELDS) if isinstance(value, dict) else value)
+            if price is not None:
+                prices[str(symbol).upper()] = price
+    elif isinstance(data, list):
+        for row in data:
+            if not isinstance(row, dict) or not row.get("symbol"):
+                continue
+            price = _number(_first(row, _PRICE_FIELDS))
+            if price is not None:
+                prices[str(row["symbol"]).upper()] = price
+    return prices
+
+
+def token_symbol(token: str) -> str:
+    """
+    Map a token (BTC) or trading pair (BTCUSDT) to its USDT trading pair.
+    """
+    token = token.strip().upper()
+    return token if token.endswith("USDT") else f"{token}USDT"
+
+
+class RateTable:
+    """
+    Indexed fiat exchange rate table (units of each currency per 1 USD).
+    """
+
+    def __init__(self):
+        self.rates: dict[str, float] = {}
+        self.updated_at: float | None = None
+
+    def age(self) -> float:
+        if self.updated_at is None:
+            return float("inf")
+        return time.monotonic() - self.updated_at
+
+    def update(self, data: Any) -> None:
+        rates = parse_rates(data)
+        if len(rates) > 1:
+            self.rates = rates
+            self.updated_at = time.monotonic()
+
+    def rate(self, currency: str) -> float:
+        currency = currency.strip().upper()
+        if currency in USD_QUOTES:
+            return 1.0
+        if currency not in self.rates:
+            raise ValueError(f"Unsupported currency: {currency}")
+        return self.rates[currency]
+
+
+class PriceCache:
+    """
+    Recently seen USD prices of trading pairs.
+    """
+
+    def __init__(self, ttl: float = 30.0):
+        self.ttl = ttl
+        self.prices: dict[str, tuple[float, float]] = {}
+
+    def update(self, data: Any) -> None:
+        now = time.monotonic()
+        for symbol, price in parse_prices(data).items():
+            self.prices[symbol] = (now, price)
+
+    def get(self, symbol: str) -> float | None:
+        entry = self.prices.get(symbol)
+        if entry is None or time.monotonic() - entry[0] > self.ttl:
+            return None
+        return entry[1]
+
+
+def convert_amount(
+    token: str,
+    currency: str,
+    amount: float,
+    rates: RateTable,
+    prices: PriceCache,
+) -> dict[str, Any]:
+    """
+    Convert an amount of a token (or fiat currency) into a fiat currency.
+    :param token: Token such as BTC, trading pair such as BTCUSDT, or fiat code such as USD
+    :param currency: Target fiat currency code
+    :param amount: Amount of token
+    :param rates: Exchange rate table
+    :param prices: Token price cache
+    :return: Conversion result with unit price and value
+    """
+    token_code = token.strip().upper()
+    if token_code in USD_QUOTES or token_code in rates.rates:
+        usd_price = 1.0 / rates.rate(token_code)
+    else:
+        usd_price = prices.get(token_symbol(token_code))
+        if usd_price is None:
+            raise ValueError(f"No price available for token: {token_code}")
+    price = usd_price * rates.rate(currency)
+    return {
+        "token": token_code,
+        "currency": currency.strip().upper(),
+        "amount": amount,
+        "price": price,
+        "value": price * amount,
+    }
@@ -0,0 +1,143 @@
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable
+
+# Approximate block times in seconds, used as the default refresh cadence per chain
+BLOCK_TIMES = {
+    "1": 12.0,
+    "10": 2.0,
+    "56": 3.0,
+    "137": 2.0,
+    "8453": 2.0,
+    "42161": 0.25,
+    "43114": 2.0,
+}
+
+DEFAULT_INTERVAL = 12.0
+
+
+def parse_gas_chains(value: str | None, min_interval: float = 2.0) -> dict[str, float]:
+    """
+    Parse a warm chain list such as "1,56,137:5,42161".
+    :param value: Comma separated chain ids, each optionally followed by :<seconds>
+    :param min_interval: Lower bound for any refresh interval
+    :return: Mapping of chain id to refresh interval in seconds
+    """
+    chains = {}
+    for item in (value or "").split(","):
+        item = item.strip()
+        if not item:
+            continue
+        chainid, _, interval = item.partition(":")
+        chainid = chainid.strip()
+        if not chainid.isdigit():
+            raise ValueError(f"Invalid chain id in gas chain list: {chainid}")
+        seconds = float(interval) if interval else BLOCK_TIMES.get(chainid, DEFAULT_INTERVAL)
+        chains[chainid] = max(seconds, min_interval)
+    return chains
+
+
+class GasScheduler:
+    """
+    Keeps gas suggestions for a set of chains warm in memory, each chain
+    refreshed by its own task on a cadence matching its block time.
+    """
+
+    def __init__(self, fetch: Callable[[str], Awaitable[Any]], chains: dict[str, float]):
+        """
+        :param fetch: Coroutine function returning the gas suggestion for a chain id
+        :param chains: Mapping of chain id to refresh interval in seconds
+        """
+        self.fetch = fetch
+        self.chains = chains
+        self.snapshots: dict[str, tuple[float, Any]] = {}
+        self._tasks: dict[str, asyncio.Task] = {}
+
+    def start(self) -> None:
+        """
+        Start refresh tasks for all configured chains in the running loop. Safe to call repeatedly.
+        """
+        loop = asyncio.get_running_loop()
+        for chainid, interval in self.chains.items():
+            task = self._tasks.get(chainid)
+            if task is None or task.done():
+                self._tasks[chainid] = loop.create_task(self._run(chainid, interval))
+
+    async def stop(self) -> None:
+        """
+        Cancel all refresh tasks.
+        """
+        tasks = list(self._tasks.values())
+        self._tasks.clear()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _run(self, chainid: str, interval: float) -> None:
+        failures = 0
+        while True:
+            try:
+                await self.refresh(chainid)
+                failures = 0
+                delay = interval
+            except Exception as e:
+                failures += 1
+                # Back off on repeated upstream errors, capped at one minute
+                delay = min(interval * 2 ** failures, 60.0)
+                logging.warning(f"Gas refresh failed for chain {chainid}: {e}")
+            await asyncio.sleep(delay)
+
+    async def refresh(self, chainid: str) -> Any:
+        """
+        Fetch the gas suggestion for one chain, keeping it in memory if the chain is warm.
+        Other chains are left to the response cache and its TTL.
+        :param chainid: Chain ID
+        :return: Gas suggestion
+        """
+        data = await self.fetch(chainid)
+        if chainid in self.chains:
+            self.snapshots[chainid] = (time.monotonic(), data)
+        return data
+
+    def get(self, chainid: str) -> Any | None:
+        """
+        Return the in-memory gas suggestion for a warm chain if it is still fresh.
+        :param chainid: Chain ID
+        :return: Gas suggestion, or None if the chain is not warm
+        """
+        interval = self.chains.get(chainid)
+        snapshot = self.snapshots.get(chainid)
+        if interval is None or snapshot is None:
+            return None
+        fetched_at, data = snapshot
+        max_age = 2 * interval
+        if time.monotonic() - fetched_at > max_age:
+            return None
+        return data
+
+    async def table(self, chainids: list[str]) -> dict[str, Any]:
+        """
+        Return gas suggestions for several chains, from memory where warm and
+        fetched concurrently (through the response cache) otherwise.
+        :param chainids: Chain IDs
+        :return: Mapping of chain id to gas suggestion and whether it came from a warm snapshot,
+            with the snapshot's age in seconds
+        """
+        table: dict[str, Any] = {}
+        missing = []
+        for chainid in chainids:
+            if self.get(chainid) is not None:
+                fetched_at, data = self.snapshots[chainid]
+                table[chainid] = {"warm": True, "age": round(time.monotonic() - fetched_at, 3), "data": data}
+            else:
+                missing.append(chainid)
+
+        results = await asyncio.gather(*(self.refresh(chainid) for chainid in missing), return_exceptions=True)
+        for chainid, result in zip(missing, results):
+            if isinstance(result, Exception):
+                table[chainid] = {"error": str(result)}
+            else:
+                # May come from the response cache, so its age is unknown here
+                table[chainid] = {"warm": False, "data": result}
+        return {chainid: table[chainid] for chainid in chainids}
@@ -0,0 +1,133 @@
+import bisect
+import time
+from typing import Any
+
+# Leaderboard keys: 24hr percent change, quote volume and last price
+LEADERBOARD_KEYS = ("change", "volume", "price")
+
+
+def _number(value: Any) -> float | None:
+    if value is None or isinstance(value, bool):
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def ticker_values(row: dict[str, Any]) -> dict[str, float | None]:
+    """
+    Extract leaderboard values from a 24hr mini ticker row.
+    Percent change is computed from openPrice/lastPrice when the row has no priceChangePercent.
+    :param row: Mini ticker row
+    :return: Mapping of leaderboard key to value
+    """
+    price = _number(row.get("lastPrice", row.get("price")))
+    change = _number(row.get("priceChangePercent"))
+    if change is None:
+        open_price = _number(row.get("openPrice"))
+        if price is not None and open_price:
+            change = (price - open_price) / open_price * 100
+    return {
+        "change": change,
+        "volume": _number(row.get("quoteVolume")),
+        "price": price,
+    }
+
+
+class TickerIndex:
+    """
+    Sorted arrays of the 24hr ticker by percent change, quote volume and price.
+    Refreshes update only the symbols whose values moved, so top-N queries are a slice
+    of an already sorted array instead of a scan of the whole universe.
+    """
+
+    # Above this share of changed symbols a full re-sort is cheaper than bisect updates
+    REBUILD_RATIO = 0.25
+
+    def __init__(self):
+        self.rows: dict[str, dict[str, Any]] = {}
+        self.values: dict[str, dict[str, float | None]] = {}
+        self.sorted: dict[str, list[tuple[float, str]]] = {key: [] for key in LEADERBOARD_KEYS}
+        self.updated_at: float | None = None
+
+    def age(self) -> float:
+        """
+        Seconds since the last refresh, infinite if never refreshed.
+        """
+        if self.updated_at is None:
+            return float("inf")
+        return time.monotonic() - self.updated_at
+
+    def _rebuild(self) -> None:
+        for key in LEADERBOARD_KEYS:
+            self.sorted[key] = sorted(
+                (values[key], symbol) for symbol, values in self.values.items() if values[key] is not None
+            )
+
+    def _remove(self, key: str, symbol: str, value: float | None) -> None:
+        if value is None:
+            return
+        entries = self.sorted[key]
+        index = bisect.bisect_left(entries, (value, symbol))
+        if index < len(entries) and entries[index] == (value, symbol):
+            del entries[index]
+
+    def update(self, rows: list[dict[str, Any]]) -> None:
+        """
+        Apply a full ticker refresh.
+        :param rows: Full 24hr mini ticker universe
+        """
+        fresh = {}
+        for row in rows or []:
+            if isinstance(row, dict) and row.get("symbol"):
+                fresh[row["symbol"]] = row
+        fresh_values = {symbol: ticker_values(row) for symbol, row in fresh.items()}
+
+        changed = [symbol for symbol, values in fresh_values.items() if self.values.get(symbol) != values]
+        removed = [symbol for symbol in self.values if symbol not in fresh]
+
+        if len(changed) + len(removed) > len(fresh) * self.REBUILD_RATIO:
+            self.values = fresh_values
+            self._rebuild()
+        else:
+            for symbol in removed + changed:
+                old = self.values.get(symbol)
+                if old is not None:
+                    for key in LEADERBOARD_KEYS:
+                        self._remove(key, symbol, old[key])
+            for symbol in removed:
+                del self.values[symbol]
+            for symbol in changed:
+                values = fresh_values[symbol]
+                self.values[symbol] = values
+                for key in LEADERBOARD_KEYS:
+                    if values[key] is not None:
+                        bisect.insort(self.sorted[key], (values[key], symbol))
+
+        self.rows = fresh
+        self.updated_at = time.monotonic()
+
+    def top(self, key: str, limit: int = 10, ascending: bool = False, quote: str | None = None) -> list[dict[str, Any]]:
+        """
+        Return the top-N ticker rows by key.
+        :param key: One of change/volume/price
+        :param limit: Number of rows to return
+        :param ascending: Return the lowest values first (e.g. top losers)
+        :param quote: Only include symbols ending with this quote asset, e.g. USDT
+        :return: Ticker rows with their rank and leaderboard value (as value)
+        """
+        if key not in LEADERBOARD_KEYS:
+            raise ValueError(f"Unsupported leaderboard key: {key}")
+        entries = self.sorted[key]
+        indexes = range(len(entries)) if ascending else range(len(entries) - 1, -1, -1)
+        quote = quote.upper() if quote else None
+        result = []
+        for index in indexes:
+            if len(result) >= limit:
+                break
+            value, symbol = entries[index]
+            if quote and not symbol.endswith(quote):
+                continue
+            result.append({"rank": len(result) + 1, **self.rows[symbol], "value": value})
+        return result
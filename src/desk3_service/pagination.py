@@ -0,0 +1,127 @@
+import base64
+import binascii
+import json
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any
+
+PAGINATION_SCHEMA_PROPERTIES = {
+    "page_size": {
+        "type": "integer",
+        "description": "Return results in pages of this many rows. The response contains items and nextCursor",
+        "minimum": 1,
+        "maximum": 5000,
+    },
+    "cursor": {
+        "type": "string",
+        "description": "Opaque nextCursor value returned by the previous page",
+    },
+}
+
+
+def rows_of(data: Any) -> list | None:
+    """
+    Return the row list of a response: the response itself or its "data" list.
+    """
+    if isinstance(data, list):
+        return data
+    if isinstance(data, dict) and isinstance(data.get("data"), list):
+        return data["data"]
+    return None
+
+
+def encode_cursor(snapshot_id: str, offset: int, page_size: int) -> str:
+    raw = json.dumps({"s": snapshot_id, "o": offset, "n": page_size}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[str, int, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        raw = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return str(raw["s"]), int(raw["o"]), int(raw["n"])
+    except (binascii.Error, ValueError, KeyError, TypeError):
+        raise ValueError("Invalid cursor")
+
+
+class SnapshotStore:
+    """
+    Short-lived snapshots of queried row lists, so that following pages are served
+    from the same consistent result without calling upstream again. Memory is bounded
+    by the total number of rows kept; the oldest snapshots are dropped first.
+    """
+
+    def __init__(self, max_snapshots: int = 16, ttl: float = 120.0, max_rows: int = 20000):
+        """
+        :param max_snapshots: Snapshots kept at most
+        :param ttl: Seconds a snapshot is kept
+        :param max_rows: Rows kept at most over all snapshots
+        """
+        self.max_snapshots = max_snapshots
+        self.ttl = ttl
+        self.max_rows = max_rows
+        self._rows = 0
+        # Snapshot id -> (created, key of the request that created it, rows)
+        self._snapshots: OrderedDict[str, tuple[float, str, list]] = OrderedDict()
+
+    def _evict(self, now: float) -> None:
+        while self._snapshots:
+            snapshot_id, (created, _, _) = next(iter(self._snapshots.items()))
+            if (
+                now - created <= self.ttl
+                and len(self._snapshots) <= self.max_snapshots
+                # The newest snapshot is kept even when larger than max_rows on its own
+                and (self._rows <= self.max_rows or len(self._snapshots) == 1)
+            ):
+                break
+            self._drop(snapshot_id)
+
+    def _drop(self, snapshot_id: str) -> None:
+        _, _, rows = self._snapshots.pop(snapshot_id)
+        self._rows -= len(rows)
+
+    def first_page(self, rows: list, key: str, page_size: int) -> dict[str, Any]:
+        """
+        Return the first page of rows, keeping a snapshot if more pages follow.
+        :param rows: Full row list
+        :param key: Key of the request the rows answer, see document_key
+        :param page_size: Rows per page
+        :return: Page with items, total and nextCursor
+        """
+        next_cursor = None
+        if len(rows) > page_size:
+            now = time.monotonic()
+            snapshot_id = uuid.uuid4().hex
+            self._snapshots[snapshot_id] = (now, key, rows)
+            self._rows += len(rows)
+            self._evict(now)
+            next_cursor = encode_cursor(snapshot_id, page_size, page_size)
+        return {"items": rows[:page_size], "total": len(rows), "nextCursor": next_cursor}
+
+    def page(self, cursor: str, key: str, page_size: int | None = None) -> dict[str, Any]:
+        """
+        Return the page a cursor points to.
+        :param cursor: Cursor returned by a previous page
+        :param key: Key of the current request, which must be the one that created the cursor
+        :param page_size: Optional new page size, defaults to the cursor's
+        :return: Page with items, total and nextCursor
+        """
+        snapshot_id, offset, cursor_page_size = decode_cursor(cursor)
+        page_size = page_size or cursor_page_size
+        now = time.monotonic()
+        self._evict(now)
+        entry = self._snapshots.get(snapshot_id)
+        if entry is None:
+            raise ValueError("Cursor expired, request the first page again without cursor")
+        if entry[1] != key:
+            raise ValueError("Cursor belongs to a different request, repeat the arguments of the first page")
+        rows = entry[2]
+        end = offset + page_size
+        next_cursor = None
+        if end < len(rows):
+            next_cursor = encode_cursor(snapshot_id, end, page_size)
+        else:
+            # Last page delivered, the snapshot is no longer needed
+            self._drop(snapshot_id)
+        return {"items": rows[offset:end], "total": len(rows), "nextCursor": next_cursor}
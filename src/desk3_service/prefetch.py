@@ -0,0 +1,252 @@
+import asyncio
+import logging
+import os
+import time
+from collections import OrderedDict, deque
+from typing import Any, Awaitable, Callable, Hashable
+
+
+class SpaceSaving:
+    """
+    Space-Saving heavy hitters sketch: approximate counts of the most frequent items
+    in at most capacity counters. Counts may overestimate by at most the item's error.
+    """
+
+    def __init__(self, capacity: int = 512):
+        self.capacity = capacity
+        self.counts: dict[Hashable, int] = {}
+        self.errors: dict[Hashable, int] = {}
+
+    def add(self, item: Hashable) -> None:
+        if item in self.counts:
+            self.counts[item] += 1
+            return
+        if len(self.counts) < self.capacity:
+            self.counts[item] = 1
+            self.errors[item] = 0
+            return
+        # Replace the least frequent item; the newcomer inherits its count as error
+        evicted = min(self.counts, key=self.counts.__getitem__)
+        floor = self.counts.pop(evicted)
+        del self.errors[evicted]
+        self.counts[item] = floor + 1
+        self.errors[item] = floor
+
+    def guaranteed(self, item: Hashable) -> int:
+        """
+        Lower bound of the item's true count.
+        """
+        return self.counts.get(item, 0) - self.errors.get(item, 0)
+
+    def estimate(self, item: Hashable) -> int:
+        return self.counts.get(item, 0)
+
+
+class TokenBucket:
+    """
+    Allows rate events per second on average, in bursts of up to burst events.
+    """
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated_at = time.monotonic()
+
+    def take(self) -> bool:
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+    def refund(self) -> None:
+        """
+        Give back a token taken for an event that did not happen after all.
+        """
+        self.tokens = min(self.burst, self.tokens + 1)
+
+
+class Prefetcher:
+    """
+    Learns which requests tend to follow each other within a session and warms the
+    response cache for likely next requests, within an upstream budget. A request is only
+    prefetched once its cached response has expired, and only prefetches that reached
+    upstream are counted against the budget and in the hit rate.
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[[str, dict], Awaitable[bool] | None],
+        ttl: Callable[[str], float],
+        budget_per_minute: float = 30,
+        window: float = 60.0,
+        min_confidence: float = 0.5,
+        min_count: int = 3,
+        capacity: int = 512,
+    ):
+        """
+        :param fetch: Function (tool name, arguments) returning a coroutine that warms the cache and
+            returns whether it called upstream, or None if the tool cannot be prefetched
+        :param ttl: Function returning the seconds a tool's response stays cached
+        :param budget_per_minute: Upstream prefetches allowed per minute, 0 disables prefetching
+        :param window: Seconds after a request during which a following request counts as co-occurring
+        :param min_confidence: Minimum estimated P(next | previous) to prefetch
+        :param min_count: Minimum observed co-occurrences to prefetch
+        :param capacity: Counters of each Space-Saving sketch
+        """
+        self.fetch = fetch
+        self.ttl = ttl
+        self.budget = TokenBucket(budget_per_minute / 60, max(budget_per_minute / 6, 1))
+        self.enabled = budget_per_minute > 0
+        self.window = window
+        self.min_confidence = min_confidence
+        self.min_count = min_count
+        self.requests = SpaceSaving(capacity)
+        self.pairs = SpaceSaving(capacity)
+        # Key -> (tool name, arguments, when its response was last fetched or asked for)
+        self.calls: OrderedDict[str, tuple[str, dict, float]] = OrderedDict()
+        self.max_calls = capacity
+        self._recent: OrderedDict[Hashable, deque] = OrderedDict()
+        # Prefetched key -> time its cached response expires unused
+        self._prefetched: dict[str, float] = {}
+        # Key being prefetched -> whether it was asked for meanwhile
+        self._running: dict[str, bool] = {}
+        self._tasks: set[asyncio.Task] = set()
+        self.stats = {
+            "observed": 0, "prefetched": 0, "hits": 0, "wasted": 0,
+            "already_cached": 0, "over_budget": 0, "failed": 0,
+        }
+
+    def observe(self, session: Hashable, key: str, name: str, arguments: dict) -> None:
+        """
+        Record a request and start prefetching its likely successors.
+        :param session: Session identifier
+        :param key: Canonical request key
+        :param name: Tool name
+        :param arguments: Canonical tool arguments
+        """
+        now = time.monotonic()
+        self.stats["observed"] += 1
+        self._expire(now)
+        if key in self._running:
+            self._running[key] = True
+        elif self._prefetched.pop(key, None) is not None:
+            self.stats["hits"] += 1
+
+        self.calls[key] = (name, arguments, now)
+        self.calls.move_to_end(key)
+        while len(self.calls) > self.max_calls:
+            self.calls.popitem(last=False)
+
+        recent = self._recent.get(session)
+        if recent is None:
+            recent = self._recent[session] = deque(maxlen=8)
+            while len(self._recent) > self.max_calls:
+                self._recent.popitem(last=False)
+        self._recent.move_to_end(session)
+        while recent and now - recent[0][1] > self.window:
+            recent.popleft()
+        for previous, _, followed_by in recent:
+            # Count each successor once per occurrence of previous, so P(next | previous) stays <= 1
+            if previous != key and key not in followed_by:
+                followed_by.add(key)
+                self.pairs.add((previous, key))
+        recent.append((key, now, set()))
+        self.requests.add(key)
+
+        if self.enabled:
+            for successor in self.successors(key):
+                self._start(successor, now)
+
+    def successors(self, key: str) -> list[tuple[str, float]]:
+        """
+        Likely next requests after key with their estimated probability, most likely first.
+        """
+        total = self.requests.estimate(key)
+        if not total:
+            return []
+        likely = []
+        for (previous, successor) in self.pairs.counts:
+            if previous != key:
+                continue
+            count = self.pairs.guaranteed((previous, successor))
+            if count >= self.min_count and count / total >= self.min_confidence:
+                likely.append((successor, count / total))
+        likely.sort(key=lambda item: item[1], reverse=True)
+        return likely
+
+    def _start(self, successor: tuple[str, float], now: float) -> None:
+        key, _ = successor
+        if key in self._prefetched or key in self._running or key not in self.calls:
+            return
+        name, arguments, seen_at = self.calls[key]
+        ttl = self.ttl(name)
+        if ttl <= 0 or now - seen_at < ttl:
+            # Not cached at all, or its response is still cached: prefetching gains nothing
+            return
+        coroutine = self.fetch(name, arguments)
+        if coroutine is None:
+            return
+        if not self.budget.take():
+            coroutine.close()
+            self.stats["over_budget"] += 1
+            return
+        self._running[key] = False
+        task = asyncio.get_running_loop().create_task(self._run(key, ttl, coroutine))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, key: str, ttl: float, coroutine: Awaitable[bool]) -> None:
+        try:
+            upstream = await coroutine
+        except Exception as e:
+            self._running.pop(key, None)
+            self.stats["failed"] += 1
+            logging.warning(f"Prefetch failed for {key}: {e}")
+            return
+        asked = self._running.pop(key, False)
+        now = time.monotonic()
+        if key in self.calls:
+            name, arguments, _ = self.calls[key]
+            self.calls[key] = (name, arguments, now)
+        if not upstream:
+            # Served from a cache (e.g. filled by another replica): nothing was spent upstream
+            self.budget.refund()
+            self.stats["already_cached"] += 1
+            return
+        self.stats["prefetched"] += 1
+        if asked:
+            self.stats["hits"] += 1
+        else:
+            self._prefetched[key] = now + ttl
+
+    def _expire(self, now: float) -> None:
+        for key, expires_at in list(self._prefetched.items()):
+            if now > expires_at:
+                del self._prefetched[key]
+                self.stats["wasted"] += 1
+
+    def metrics(self) -> dict[str, Any]:
+        used = self.stats["hits"] + self.stats["wasted"]
+        return {
+            **self.stats,
+            "enabled": self.enabled,
+            "pending": len(self._prefetched),
+            "hit_rate": self.stats["hits"] / used if used else None,
+        }
+
+
+def prefetcher_from_env(
+    fetch: Callable[[str, dict], Awaitable[bool] | None],
+    ttl: Callable[[str], float],
+) -> Prefetcher:
+    return Prefetcher(
+        fetch,
+        ttl,
+        budget_per_minute=float(os.getenv("DESK3_PREFETCH_BUDGET", "30")),
+        min_confidence=float(os.getenv("DESK3_PREFETCH_MIN_CONFIDENCE", "0.5")),
+        min_count=int(os.getenv("DESK3_PREFETCH_MIN_COUNT", "3")),
+    )
@@ -0,0 +1,213 @@
+import heapq
+import re
+from typing import Any
+
+# Generic list arguments accepted by list-returning tools and resources
+QUERY_ARGUMENTS = ("fields", "filter", "sort", "limit", "offset")
+
+QUERY_SCHEMA_PROPERTIES = {
+    "fields": {
+        "type": "string",
+        "description": "Comma separated list of fields to keep in each row (e.g. symbol,lastPrice). For array rows use column indexes (e.g. 0,1)",
+        "examples": ["symbol,lastPrice", "symbol,quoteVolume"],
+    },
+    "filter": {
+        "type": "string",
+        "description": "Comma separated conditions joined with AND. Operators: = != > >= < <= ~ (contains, case-insensitive), e.g. quoteVolume>1000000,symbol~USDT",
+        "examples": ["symbol~USDT", "lastPrice>1", "Triggered=true"],
+    },
+    "sort": {
+        "type": "string",
+        "description": "Field to sort rows by, prefix with - for descending order (e.g. -quoteVolume)",
+        "examples": ["-quoteVolume", "symbol"],
+    },
+    "limit": {
+        "type": "integer",
+        "description": "Maximum number of rows to return",
+        "minimum": 1,
+    },
+    "offset": {
+        "type": "integer",
+        "description": "Number of rows to skip before returning results",
+        "minimum": 0,
+    },
+}
+
+_CONDITION_RE = re.compile(r"^\s*([^<>=!~]+?)\s*(>=|<=|!=|=|>|<|~)\s*(.*?)\s*$")
+
+
+def _get_field(row: Any, field: str) -> Any:
+    if isinstance(row, dict):
+        return row.get(field)
+    if isinstance(row, (list, tuple)) and field.isdigit():
+        index = int(field)
+        return row[index] if index < len(row) else None
+    return None
+
+
+def _as_number(value: Any) -> float | None:
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        try:
+            return float(value)
+        except ValueError:
+            return None
+    return None
+
+
+def _parse_filter(expression: str) -> list[tuple[str, str, str]]:
+    conditions = []
+    for clause in expression.split(","):
+        if not clause.strip():
+            continue
+        match = _CONDITION_RE.match(clause)
+        if not match:
+            raise ValueError(f"Invalid filter condition: {clause.strip()}")
+        conditions.append(match.groups())
+    return conditions
+
+
+def _matches(row: Any, conditions: list[tuple[str, str, str]]) -> bool:
+    for field, op, expected in conditions:
+        value = _get_field(row, field)
+        if value is None:
+            return False
+        if op == "~":
+            if expected.lower() not in str(value).lower():
+                return False
+            continue
+        left, right = _as_number(value), _as_number(expected)
+        if left is None or right is None:
+            left, right = str(value).lower(), expected.lower()
+        if op == "=" and not left == right:
+            return False
+        if op == "!=" and not left != right:
+            return False
+        if op == ">" and not left > right:
+            return False
+        if op == ">=" and not left >= right:
+            return False
+        if op == "<" and not left < right:
+            return False
+        if op == "<=" and not left <= right:
+            return False
+    return True
+
+
+def _sort_key(field: str):
+    # Numbers (including numeric strings) order before other values
+    def key(row: Any) -> tuple:
+        value = _get_field(row, field)
+        number = _as_number(value)
+        if number is not None:
+            return (0, number, "")
+        return (1, 0.0, str(value))
+    return key
+
+
+def _project(row: Any, fields: list[str]) -> Any:
+    if isinstance(row, dict):
+        return {field: row[field] for field in fields if field in row}
+    if isinstance(row, (list, tuple)):
+        return [_get_field(row, field) for field in fields]
+    return row
+
+
+def _split_fields(fields: str | list[str] | None) -> list[str]:
+    if not fields:
+        return []
+    if isinstance(fields, str):
+        fields = fields.split(",")
+    return [field.strip() for field in fields if field and field.strip()]
+
+
+def query_rows(
+    rows: list,
+    fields: str | list[str] | None = None,
+    filter: str | None = None,
+    sort: str | None = None,
+    limit: int | None = None,
+    offset: int | None = None,
+) -> list:
+    """
+    Filter, sort, slice and project a list of rows.
+    :param rows: List of dict rows (or array rows addressed by column index)
+    :param fields: Fields to keep in each row
+    :param filter: Conditions joined with AND, e.g. "quoteVolume>1000000,symbol~USDT"
+    :param sort: Field to sort by, "-" prefix for descending
+    :param limit: Maximum number of rows to return
+    :param offset: Number of rows to skip
+    :return: Resulting rows
+    """
+    offset = int(offset or 0)
+    limit = int(limit) if limit is not None else None
+    if offset < 0 or (limit is not None and limit < 0):
+        raise ValueError("limit and offset must not be negative")
+
+    if filter:
+        conditions = _parse_filter(filter)
+        rows = [row for row in rows if _matches(row, conditions)]
+
+    if sort:
+        sort = sort.strip()
+        reverse = sort.startswith("-")
+        field = sort.lstrip("+-")
+        key = _sort_key(field)
+        # Rows without the sort field always go last, whatever the direction
+        present = [row for row in rows if _get_field(row, field) is not None]
+        missing = [row for row in rows if _get_field(row, field) is None]
+        if limit is not None and offset + limit < len(present):
+            # Partial selection is O(n log k) instead of sorting the whole universe
+            select = heapq.nlargest if reverse else heapq.nsmallest
+            rows = select(offset + limit, present, key=key)
+        else:
+            rows = sorted(present, key=key, reverse=reverse) + missing
+
+    if offset or limit is not None:
+        rows = rows[offset:offset + limit if limit is not None else None]
+
+    field_list = _split_fields(fields)
+    if field_list:
+        rows = [_project(row, field_list) for row in rows]
+    return rows
+
+
+def has_query(arguments: dict | None) -> bool:
+    """
+    Check whether any generic list argument is present.
+    """
+    return bool(arguments) and any(arguments.get(name) not in (None, "") for name in QUERY_ARGUMENTS)
+
+
+def apply_query(data: Any, arguments: dict | None) -> Any:
+    """
+    Apply fields/filter/sort/limit/offset arguments to an upstream response.
+    Lists are queried directly, objects wrapping a "data" list are queried in place,
+    and other objects only support field projection.
+    :param data: Upstream response
+    :param arguments: Tool arguments or resource query parameters
+    :return: Reduced response
+    """
+    if not has_query(arguments):
+        return data
+    options = {name: arguments.get(name) for name in QUERY_ARGUMENTS if arguments.get(name) not in (None, "")}
+    try:
+        if "limit" in options:
+            options["limit"] = int(options["limit"])
+        if "offset" in options:
+            options["offset"] = int(options["offset"])
+    except (TypeError, ValueError):
+        raise ValueError("limit and offset must be integers")
+
+    if isinstance(data, list):
+        return query_rows(data, **options)
+    if isinstance(data, dict) and isinstance(data.get("data"), list):
+        return {**data, "data": query_rows(data["data"], **options)}
+    if isinstance(data, dict):
+        field_list = _split_fields(options.get("fields"))
+        if field_list:
+            return _project(data, field_list)
+    return data
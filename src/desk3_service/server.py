@@ -1,14 +1,27 @@
+import asyncio
+import functools
 import os
 
 from dotenv import load_dotenv
 from typing import Any
-import requests
+from urllib.parse import urlparse
 import json
 from mcp.server.models import InitializationOptions
 import mcp.types as types
 from mcp.server import NotificationOptions, Server
 from pydantic import AnyUrl
-import mcp.server.stdio
+
+from .cache import ResponseCache, create_backend
+from .canonical import canonical_arguments, request_key
+from .changes import CHANGES_SCHEMA_PROPERTIES, ChangeTracker
+from .delta import DELIVERY_ARGUMENTS, DELTA_SCHEMA_PROPERTIES, DeltaTracker, document_key, wants_delta
+from .economic_calendar import CALENDAR_QUERY_SCHEMA_PROPERTIES, CalendarStore
+from .fiat import PriceCache, RateTable, USD_QUOTES, convert_amount, token_symbol
+from .gas import GasScheduler, parse_gas_chains
+from .leaderboard import LEADERBOARD_KEYS, TickerIndex
+from .pagination import PAGINATION_SCHEMA_PROPERTIES, SnapshotStore, rows_of
+from .prefetch import prefetcher_from_env
+from .query import QUERY_ARGUMENTS, QUERY_SCHEMA_PROPERTIES, apply_query
 
 import logging
 
@@ -21,6 +34,9 @@ if not API_KEY:
 logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s')
 
 def request_api(method: str, url: str, params: dict = None, data: dict = None) -> any:
+    # Imported on first use: requests is not needed to answer initialize
+    import requests
+
     headers = {
         'Accepts': 'application/json',
         'X-DESK3_PRO_API_KEY': API_KEY,
@@ -40,29 +56,172 @@ def request_api(method: str, url: str, params: dict = None, data: dict = None) -
         logging.error(f"Error during {method.upper()} {url}: {e}")
         raise
 
+# Freshness in seconds of cached upstream responses, per endpoint path
+CACHE_TTLS = {
+    '/v1/price/getSuggestGas': 2,
+    '/v1/market/exchangeRate': 300,
+    '/v1/market/mini/24hr': 5,
+    '/v1/market/price': 5,
+    '/v1/market/circulating': 600,
+    '/v1/market/fear-greed': 300,
+    '/v1/market/btc/trend': 3600,
+    '/v1/market/eth/trend': 3600,
+    '/v1/market/altcoin/season': 600,
+    '/v1/market/bitcoin/dominance': 300,
+    '/v1/market/cycleIndicators': 300,
+    '/v1/market/pi-cycle-top': 3600,
+    '/v1/market/rainbow': 3600,
+    '/v1/market/puell-multiple': 3600,
+    '/v1/market/cycles': 600,
+    '/v1/market/calendar': 3600,
+}
+# Multiplier applied to all cache TTLs, 0 disables the response cache
+CACHE_TTL_SCALE = float(os.getenv("DESK3_CACHE_TTL_SCALE", "1"))
+
+# Response cache backend: in-process by default, redis://host:port/db to share across replicas
+response_cache = ResponseCache(create_backend(os.getenv("DESK3_CACHE_URL")))
+
+def cache_key(url: str, params: dict | None = None) -> str:
+    query = "&".join(f"{key}={value}" for key, value in sorted((params or {}).items()) if value is not None)
+    return f"desk3:{url}?{query}"
+
+async def fetch_api(url: str, params: dict | None = None) -> Any:
+    """
+    GET an upstream endpoint through the response cache.
+    :param url: Endpoint URL
+    :param params: Query parameters
+    :return: Response data
+    """
+    # Equivalent requests (symbol order, case, duplicates) share one cache entry and one upstream call
+    params = canonical_arguments(params)
+    ttl = CACHE_TTLS.get(urlparse(url).path, 0) * CACHE_TTL_SCALE
+    if ttl <= 0:
+        return await asyncio.to_thread(request_api, 'get', url, params=params)
+    return await response_cache.get_or_fetch(
+        cache_key(url, params),
+        ttl,
+        lambda: request_api('get', url, params=params),
+    )
+
+SUGGEST_GAS_URL = 'https://mcp.desk3.io/v1/price/getSuggestGas'
+
 async def get_suggest_gas(chainid: str) -> dict[str, Any]:
     """
     Get EIP1559 estimated gas information.
     :param chainid: Chain ID, required
     :return: Gas suggestion and trend information
     """
-    url = 'https://mcp.desk3.io/v1/price/getSuggestGas'
+    cached = gas_scheduler.get(chainid)
+    if cached is not None:
+        return cached
     params = {'chainid': chainid}
     try:
-        return request_api('get', url, params=params)
+        return await fetch_api(SUGGEST_GAS_URL, params=params)
     except Exception as e:
         raise RuntimeError(f"Failed to fetch suggest gas data: {e}")
 
+# Chains whose gas suggestions are kept warm in memory, e.g. "1,56,137:5,42161" (none by default)
+gas_scheduler = GasScheduler(
+    fetch=lambda chainid: fetch_api(SUGGEST_GAS_URL, params={'chainid': chainid}),
+    chains=parse_gas_chains(
+        os.getenv("DESK3_GAS_CHAINS"),
+        min_interval=float(os.getenv("DESK3_GAS_MIN_INTERVAL", "2")),
+    ),
+)
+
+DEFAULT_GAS_CHAINS = ["1", "56", "137", "42161"]
+
+async def get_gas_table(chainids: list[str] | None = None) -> dict[str, Any]:
+    """
+    Get EIP1559 gas suggestions for several chains in one call.
+    :param chainids: Chain IDs, defaults to the warm chains (or the main EVM chains if none are configured)
+    :return: Mapping of chain id to gas suggestion
+    """
+    chainids = chainids or list(gas_scheduler.chains) or DEFAULT_GAS_CHAINS
+    try:
+        return await gas_scheduler.table(chainids)
+    except Exception as e:
+        raise RuntimeError(f"Failed to fetch gas table data: {e}")
+
+EXCHANGE_RATE_URL = 'https://mcp.desk3.io/v1/market/exchangeRate'
+
 async def get_exchange_rate() -> dict[str, Any]:
     """
     Get list of fiat currency exchange rates.
     :return: Exchange rate data
     """
-    url = 'https://mcp.desk3.io/v1/market/exchangeRate'
     try:
-        return request_api('get', url)
+        data = await fetch_api(EXCHANGE_RATE_URL)
     except Exception as e:
         raise RuntimeError(f"Failed to fetch exchange rate data: {e}")
+    rate_table.update(data)
+    return data
+
+# Fiat rate table refreshed in the background every RATE_REFRESH_INTERVAL seconds
+RATE_REFRESH_INTERVAL = float(os.getenv("DESK3_RATE_INTERVAL", "300"))
+rate_table = RateTable()
+# Token prices seen in recent price/ticker responses, reused by conversions
+price_cache = PriceCache(ttl=float(os.getenv("DESK3_PRICE_TTL", "30")))
+
+async def refresh_rate_table() -> None:
+    rate_table.update(await fetch_api(EXCHANGE_RATE_URL))
+
+async def refresh_rate_table_forever() -> None:
+    while True:
+        try:
+            await refresh_rate_table()
+        except Exception as e:
+            logging.warning(f"Exchange rate refresh failed: {e}")
+        await asyncio.sleep(RATE_REFRESH_INTERVAL)
+
+async def convert(conversions: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """
+    Price tokens (or fiat amounts) in fiat currencies using the cached rate table.
+    Token prices missing from the price cache are fetched in one batched upstream call,
+    falling back to one call per token if the batch fails.
+    :param conversions: List of {token, currency, amount}
+    :return: Conversion results, with an error entry for pairs that cannot be priced
+    """
+    if rate_table.age() > RATE_REFRESH_INTERVAL * 2:
+        try:
+            await refresh_rate_table()
+        except Exception as e:
+            if not rate_table.rates:
+                raise
+            # Older rates are better than no conversion at all
+            logging.warning(f"Exchange rate refresh failed, converting with rates {rate_table.age():.0f}s old: {e}")
+    missing = sorted({
+        token_symbol(item["token"])
+        for item in conversions
+        if item["token"].strip().upper() not in USD_QUOTES
+        and item["token"].strip().upper() not in rate_table.rates
+        and price_cache.get(token_symbol(item["token"])) is None
+    })
+    if missing:
+        try:
+            await get_token_price(symbol=",".join(missing))
+        except Exception as e:
+            # One unknown symbol can fail the whole batch: price the others one by one,
+            # tokens that still fail are reported per item by convert_amount
+            logging.warning(f"Batched token price fetch failed: {e}")
+            if len(missing) > 1:
+                await asyncio.gather(
+                    *(get_token_price(symbol=symbol) for symbol in missing),
+                    return_exceptions=True,
+                )
+    results = []
+    for item in conversions:
+        try:
+            results.append(convert_amount(
+                item["token"],
+                item["currency"],
+                float(item.get("amount", 1)),
+                rate_table,
+                price_cache,
+            ))
+        except ValueError as e:
+            results.append({"token": item["token"], "currency": item["currency"], "error": str(e)})
+    return results
 
 async def get_mini_24hr(symbol: str | None = None) -> list[dict[str, Any]]:
     """
@@ -75,10 +234,43 @@ async def get_mini_24hr(symbol: str | None = None) -> list[dict[str, Any]]:
     if symbol:
         params['symbol'] = symbol
     try:
-        return request_api('get', url, params=params)
+        return await fetch_api(url, params=params)
     except Exception as e:
         raise RuntimeError(f"Failed to fetch mini 24hr data: {e}")
 
+# Sorted index over the full 24hr ticker, refreshed at most every TICKER_TTL seconds
+TICKER_TTL = float(os.getenv("DESK3_TICKER_TTL", "15"))
+ticker_index = TickerIndex()
+ticker_index_lock = asyncio.Lock()
+
+async def get_mini_24hr_indexed(symbol: str | None = None) -> list[dict[str, Any]]:
+    """
+    Get 24-hour mini ticker information, feeding full-universe responses into the ticker index.
+    :param symbol: Trading pair, comma separated for multiple, return all if not provided
+    :return: Mini ticker info array
+    """
+    data = await get_mini_24hr(symbol=symbol)
+    if not symbol and isinstance(data, list):
+        ticker_index.update(data)
+    price_cache.update(data)
+    return data
+
+async def get_top_movers(key: str = "change", order: str = "desc", limit: int = 10, quote: str | None = None) -> list[dict[str, Any]]:
+    """
+    Get top-N 24hr tickers by percent change, quote volume or price from the ticker index.
+    :param key: change, volume or price
+    :param order: desc for gainers/leaders, asc for losers/laggards
+    :param limit: Number of rows to return
+    :param quote: Only include pairs quoted in this asset, e.g. USDT
+    :return: Ranked mini ticker rows
+    """
+    if key not in LEADERBOARD_KEYS:
+        raise ValueError(f"Unsupported key: {key}")
+    async with ticker_index_lock:
+        if ticker_index.age() > TICKER_TTL:
+            await get_mini_24hr_indexed()
+    return ticker_index.top(key, limit=limit, ascending=order == "asc", quote=quote)
+
 async def get_token_price(symbol: str | None = None) -> dict[str, Any]:
     """
     Get real-time token price information.
@@ -90,9 +282,11 @@ async def get_token_price(symbol: str | None = None) -> dict[str, Any]:
     if symbol:
         params['symbol'] = symbol
     try:
-        return request_api('get', url, params=params)
+        data = await fetch_api(url, params=params)
     except Exception as e:
         raise RuntimeError(f"Failed to fetch token price data: {e}")
+    price_cache.update(data)
+    return data
 
 async def get_token_circulating_supply(symbol: str) -> dict[str, Any]:
     """
@@ -103,7 +297,7 @@ async def get_token_circulating_supply(symbol: str) -> dict[str, Any]:
     url = 'https://mcp.desk3.io/v1/market/circulating'
     params = {'symbol': symbol}
     try:
-        return request_api('get', url, params=params)
+        return await fetch_api(url, params=params)
     except Exception as e:
         raise RuntimeError(f"Failed to fetch token circulating supply data: {e}")
 
@@ -114,7 +308,7 @@ async def get_fear_greed_index() -> dict[str, Any]:
     """
     url = 'https://mcp.desk3.io/v1/market/fear-greed'
     try:
-        return request_api('get', url)
+        return await fetch_api(url)
     except Exception as e:
         raise RuntimeError(f"Failed to fetch fear & greed index: {e}")
 
@@ -125,7 +319,7 @@ async def get_btc_trend() -> list[list]:
     """
     url = 'https://mcp.desk3.io/v1/market/btc/trend'
     try:
-        return request_api('get', url)
+        return await fetch_api(url)
     except Exception as e:
         raise RuntimeError(f"Failed to fetch BTC trend data: {e}")
 
@@ -136,7 +330,7 @@ async def get_eth_trend() -> list[list]:
     """
     url = 'https://mcp.desk3.io/v1/market/eth/trend'
     try:
-        return request_api('get', url)
+        return await fetch_api(url)
     except Exception as e:
         raise RuntimeError(f"Failed to fetch ETH trend data: {e}")
 
@@ -147,7 +341,7 @@ async def get_altcoin_season_index() -> dict:
     """
     url = 'https://mcp.desk3.io/v1/market/altcoin/season'
     try:
-        return request_api('get', url)
+        return await fetch_api(url)
     except Exception as e:
         raise RuntimeError(f"Failed to fetch Altcoin Season Index data: {e}")
 
@@ -158,7 +352,7 @@ async def get_bitcoin_dominance() -> dict:
     """
     url = 'https://mcp.desk3.io/v1/market/bitcoin/dominance'
     try:
-        return request_api('get', url)
+        return await fetch_api(url)
     except Exception as e:
         raise RuntimeError(f"Failed to fetch Bitcoin dominance data: {e}")
 
@@ -169,7 +363,7 @@ async def get_cycle_indicators() -> dict[str, Any]:
     """
     url = 'https://mcp.desk3.io/v1/market/cycleIndicators'
     try:
-        return request_api('get', url)
+        return await fetch_api(url)
     except Exception as e:
         raise RuntimeError(f"Failed to fetch cycle indicators data: {e}")
 
@@ -180,7 +374,7 @@ async def get_pi_cycle_top() -> dict[str, Any]:
     """
     url = 'https://mcp.desk3.io/v1/market/pi-cycle-top'
     try:
-        return request_api('get', url)
+        return await fetch_api(url)
     except Exception as e:
         raise RuntimeError(f"Failed to fetch Pi Cycle Top indicator data: {e}")
 
@@ -191,7 +385,7 @@ async def get_rainbow_chart() -> dict[str, Any]:
     """
     url = 'https://mcp.desk3.io/v1/market/rainbow'
     try:
-        return request_api('get', url)
+        return await fetch_api(url)
     except Exception as e:
         raise RuntimeError(f"Failed to fetch Bitcoin Rainbow Chart data: {e}")
 
@@ -202,7 +396,7 @@ async def get_puell_multiple() -> dict[str, Any]:
     """
     url = 'https://mcp.desk3.io/v1/market/puell-multiple'
     try:
-        return request_api('get', url)
+        return await fetch_api(url)
     except Exception as e:
         raise RuntimeError(f"Failed to fetch Puell Multiple data: {e}")
 
@@ -214,32 +408,278 @@ async def get_cycles() -> dict[str, Any]:
     """
     url = 'https://mcp.desk3.io/v1/market/cycles'
     try:
-        return request_api('get', url)
+        return await fetch_api(url)
     except Exception as e:
         raise RuntimeError(f"Failed to fetch cycles data: {e}")
 
+# Sources watched by get_changes
+CHANGE_SOURCES = {
+    "cycle_indicators": get_cycle_indicators,
+    "cycles": get_cycles,
+    "fear_greed": get_fear_greed_index,
+    "altcoin_season": get_altcoin_season_index,
+}
+change_tracker = ChangeTracker()
+
+async def get_changes(since: str | None = None, sources: str | None = None, min_change_pct: float | None = None) -> dict[str, Any]:
+    """
+    Get transitions of cycle indicators and sentiment since an earlier call.
+    :param since: Token returned by the previous call
+    :param sources: Comma separated source names, all if not provided
+    :param min_change_pct: Also report numeric moves of at least this percentage
+    :return: New token and the list of changes (empty if nothing changed)
+    """
+    names = [name.strip() for name in sources.split(",") if name.strip()] if sources else list(CHANGE_SOURCES)
+    unknown = [name for name in names if name not in CHANGE_SOURCES]
+    if unknown:
+        raise ValueError(f"Unsupported sources: {', '.join(unknown)}")
+    results = await asyncio.gather(*(CHANGE_SOURCES[name]() for name in names), return_exceptions=True)
+    fresh, errors = {}, {}
+    for name, result in zip(names, results):
+        if isinstance(result, Exception):
+            errors[name] = str(result)
+        else:
+            fresh[name] = result
+    if not fresh and not change_tracker.snapshots:
+        raise RuntimeError(f"Failed to fetch change sources: {errors}")
+    change_tracker.record(fresh)
+    answer = change_tracker.changes_since(since, names, float(min_change_pct) if min_change_pct is not None else None)
+    if errors:
+        answer["errors"] = errors
+    return answer
+
 async def get_market_calendar(date: str | None = None) -> dict[str, Any]:
     """
     Get economic calendar for specified month. Shows important market or political events.
     :param date: Year-month in format YYYY-MM (e.g., 2025-09). If not provided, returns current month
     :return: Economic calendar data with events organized by day
     """
-    url = 'https://mcp.desk3.io/v1/market/calendar'
-    params = {}
-    if date:
-        params['date'] = date
     try:
-        return request_api('get', url, params=params)
+        index = await calendar_store.month(date or calendar_store.current_month())
+        return index.raw
     except Exception as e:
         raise RuntimeError(f"Failed to fetch market calendar data: {e}")
 
+CALENDAR_URL = 'https://mcp.desk3.io/v1/market/calendar'
+
+# Economic calendar months cached and indexed by date, country and importance
+calendar_store = CalendarStore(
+    fetch=lambda month: fetch_api(CALENDAR_URL, params={'date': month}),
+    ttl=float(os.getenv("DESK3_CALENDAR_TTL", "3600")),
+)
+
+def has_calendar_query(arguments: dict | None) -> bool:
+    return bool(arguments) and any(
+        arguments.get(name) not in (None, "") for name in CALENDAR_QUERY_SCHEMA_PROPERTIES
+    )
+
+async def query_market_calendar(arguments: dict) -> dict[str, Any]:
+    """
+    Query economic calendar events by date range, next-N, country, importance and category.
+    :param arguments: Tool arguments or resource query parameters (date restricts to one month)
+    :return: Matching events and their count
+    """
+    start, end = arguments.get("start"), arguments.get("end")
+    date = arguments.get("date")
+    if date and not start and not end:
+        start, end = f"{date}-01", f"{date}-31"
+    next_count = arguments.get("next")
+    min_importance = arguments.get("min_importance")
+    try:
+        events = await calendar_store.query(
+            start=start,
+            end=end,
+            next=int(next_count) if next_count else None,
+            country=arguments.get("country"),
+            min_importance=float(min_importance) if min_importance not in (None, "") else None,
+            category=arguments.get("category"),
+        )
+    except Exception as e:
+        raise RuntimeError(f"Failed to query market calendar data: {e}")
+    return {"count": len(events), "events": events}
+
+background_tasks: dict[str, asyncio.Task] = {}
+
+def start_background_task(name: str, factory) -> None:
+    """
+    Start a named background task in the running loop unless it is already running.
+    """
+    task = background_tasks.get(name)
+    if task is None or task.done():
+        background_tasks[name] = asyncio.get_running_loop().create_task(factory())
+
+def start_background_refreshers() -> None:
+    """
+    Start the process-wide background refreshers. Safe to call once per session.
+    """
+    gas_scheduler.start()
+    start_background_task("rates", refresh_rate_table_forever)
+
+async def stop_background_refreshers() -> None:
+    """
+    Stop the background refreshers started by start_background_refreshers.
+    """
+    await gas_scheduler.stop()
+    tasks = list(background_tasks.values())
+    background_tasks.clear()
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+async def warm_up() -> None:
+    """
+    Start the background refreshers and load the full ticker, so the first sessions
+    of a freshly started server do not all miss the cache at once.
+    """
+    start_background_refreshers()
+    await get_mini_24hr_indexed()
+
+async def shutdown() -> None:
+    """
+    Stop background upstream traffic and flush the response cache to its backend.
+    """
+    await stop_background_refreshers()
+    await response_cache.flush()
+
 server = Server("desk3_service")
 
+async def handle_initialized(_notification: types.InitializedNotification) -> None:
+    # Start background upstream traffic only after the handshake so it never delays initialize
+    start_background_refreshers()
+
+server.notification_handlers[types.InitializedNotification] = handle_initialized
+
+# Upstream fetches that warm the response cache for a predicted tool call
+# Tool -> (upstream path whose cache TTL applies, fetcher) for tools that can be prefetched
+PREFETCH_FETCHERS = {
+    "get_suggest_gas": ('/v1/price/getSuggestGas', lambda arguments: get_suggest_gas(chainid=arguments["chainid"])),
+    "get_exchange_rate": ('/v1/market/exchangeRate', lambda arguments: get_exchange_rate()),
+    "get_mini_24hr": ('/v1/market/mini/24hr', lambda arguments: get_mini_24hr_indexed(symbol=arguments.get("symbol"))),
+    "get_token_price": ('/v1/market/price', lambda arguments: get_token_price(symbol=arguments.get("symbol"))),
+    "get_token_circulating_supply": ('/v1/market/circulating', lambda arguments: get_token_circulating_supply(symbol=arguments["symbol"])),
+    "get_fear_greed_index": ('/v1/market/fear-greed', lambda arguments: get_fear_greed_index()),
+    "get_btc_trend": ('/v1/market/btc/trend', lambda arguments: get_btc_trend()),
+    "get_eth_trend": ('/v1/market/eth/trend', lambda arguments: get_eth_trend()),
+    "get_altcoin_season_index": ('/v1/market/altcoin/season', lambda arguments: get_altcoin_season_index()),
+    "get_bitcoin_dominance": ('/v1/market/bitcoin/dominance', lambda arguments: get_bitcoin_dominance()),
+    "get_cycle_indicators": ('/v1/market/cycleIndicators', lambda arguments: get_cycle_indicators()),
+    "get_pi_cycle_top": ('/v1/market/pi-cycle-top', lambda arguments: get_pi_cycle_top()),
+    "get_rainbow_chart": ('/v1/market/rainbow', lambda arguments: get_rainbow_chart()),
+    "get_puell_multiple": ('/v1/market/puell-multiple', lambda arguments: get_puell_multiple()),
+    "get_cycles": ('/v1/market/cycles', lambda arguments: get_cycles()),
+}
+
+def prefetch_ttl(name: str) -> float:
+    """
+    Seconds the response of a prefetchable tool stays in the response cache.
+    """
+    path, _ = PREFETCH_FETCHERS.get(name, (None, None))
+    return CACHE_TTLS.get(path, 0) * CACHE_TTL_SCALE
+
+async def prefetch_upstream(fetcher, arguments: dict) -> bool:
+    with response_cache.counting_upstream() as calls:
+        await fetcher(arguments)
+    return calls[0] > 0
+
+def prefetch_call(name: str, arguments: dict) -> Any:
+    """
+    Coroutine warming the cache for a tool call and returning whether it called upstream,
+    or None if the tool cannot be prefetched.
+    """
+    if name not in PREFETCH_FETCHERS:
+        return None
+    _, fetcher = PREFETCH_FETCHERS[name]
+    return prefetch_upstream(fetcher, arguments)
+
+# Learns co-occurring tool calls and prefetches likely next ones within DESK3_PREFETCH_BUDGET
+prefetcher = prefetcher_from_env(prefetch_call, prefetch_ttl)
+
+def observe_call(name: str, arguments: dict) -> None:
+    """
+    Feed a tool call into the prefetcher. Query and delivery arguments do not change the
+    upstream request, so they are left out of the key.
+    """
+    try:
+        session = id(server.request_context.session)
+    except LookupError:
+        session = None
+    key = request_key(name, arguments, exclude=QUERY_ARGUMENTS + DELIVERY_ARGUMENTS)
+    prefetcher.observe(session, key, name, arguments)
+
+# Snapshots backing cursor pagination of large list responses
+snapshots = SnapshotStore()
+
+def paginate(name: str, data: Any, arguments: dict | None) -> Any:
+    """
+    Apply page_size/cursor arguments to a (queried) list response.
+    :param name: Resource path shared by the resource and its tool, e.g. /mini/24hr
+    :param data: Response data
+    :param arguments: Tool arguments or resource query parameters
+    :return: Page with items/total/nextCursor, or data unchanged if not paginated
+    """
+    if not arguments:
+        return data
+    page_size = arguments.get("page_size")
+    page_size = int(page_size) if page_size else None
+    # Cursors only continue the request (path and query arguments) that created them
+    key = document_key(name, arguments)
+    if arguments.get("cursor"):
+        return snapshots.page(arguments["cursor"], key, page_size)
+    rows = rows_of(data)
+    if not page_size or rows is None:
+        return data
+    return snapshots.first_page(rows, key, page_size)
+
+async def fetch_list(name: str, fetch, arguments: dict | None) -> Any:
+    """
+    Fetch a list response and apply query and pagination arguments.
+    Pages after the first are served from the snapshot without calling upstream.
+    :param name: Resource path shared by the resource and its tool, e.g. /mini/24hr
+    :param fetch: Zero-argument coroutine function calling upstream
+    :param arguments: Tool arguments or resource query parameters
+    :return: Response data
+    """
+    if arguments and arguments.get("cursor"):
+        return paginate(name, None, arguments)
+    return paginate(name, apply_query(await fetch(), arguments), arguments)
+
+# Versions of documents delivered to each session, for delta reads
+delta_tracker = DeltaTracker()
+
+def deliver_document(name: str, data: Any, arguments: dict | None) -> Any:
+    """
+    Return the full document or, when delta is requested, only what changed since the
+    version last delivered to this session (or the since token).
+    :param name: Resource path shared by the resource and its tool, e.g. /mini/24hr
+    :param data: Full (queried) document
+    :param arguments: Tool arguments or resource query parameters
+    :return: Full document, or delta with version token
+    """
+    delta = wants_delta(arguments)
+    if arguments and (arguments.get("page_size") or arguments.get("cursor")):
+        if delta:
+            raise ValueError("delta cannot be combined with page_size or cursor")
+        # A page is not a version of the document, do not record it
+        return data
+    try:
+        session = server.request_context.session
+    except LookupError:
+        session = None
+    since = arguments.get("since") if arguments else None
+    return delta_tracker.deliver(document_key(name, arguments), data, session, delta=delta, since=since)
+
 @server.list_resources()
 async def handle_list_resources() -> list[types.Resource]:
     """
     List available desk3 resources.
     """
+    return resource_definitions()
+
+@functools.cache
+def resource_definitions() -> list[types.Resource]:
+    """
+    Build the static resource list once per process.
+    """
     resources = [
         types.Resource(
             uri=AnyUrl("desk3://gas/suggest"),
@@ -250,6 +690,15 @@ async def handle_list_resources() -> list[types.Resource]:
             annotations=None,
             meta=None,
         ),
+        types.Resource(
+            uri=AnyUrl("desk3://gas/table"),
+            name="Multi-chain Gas Table",
+            description="EIP1559 gas suggestions for several chains in one read, served from memory for warm chains. Use ?chainids=1,56,137,42161",
+            mimeType="application/json",
+            size=None,
+            annotations=None,
+            meta=None,
+        ),
         types.Resource(
             uri=AnyUrl("desk3://market/exchangeRate"),
             name="Fiat Exchange Rate List",
@@ -268,6 +717,15 @@ async def handle_list_resources() -> list[types.Resource]:
             annotations=None,
             meta=None,
         ),
+        types.Resource(
+            uri=AnyUrl("desk3://market/top-movers"),
+            name="24hr Top Movers",
+            description="Top 24hr gainers, losers and volume leaders from a server-side sorted index. Use ?key=change|volume|price&order=desc|asc&limit=10&quote=USDT",
+            mimeType="application/json",
+            size=None,
+            annotations=None,
+            meta=None,
+        ),
         types.Resource(
             uri=AnyUrl("desk3://market/price"),
             name="Token Price Info",
@@ -376,6 +834,15 @@ async def handle_list_resources() -> list[types.Resource]:
             annotations=None,
             meta=None,
         ),
+        types.Resource(
+            uri=AnyUrl("desk3://market/changes"),
+            name="Cycle and Sentiment Changes",
+            description="Transitions of cycle indicators, cycles, fear & greed and altcoin season since an earlier read: Triggered flips, band crossings and status changes. Use ?since=<token> with the token of the previous read",
+            mimeType="application/json",
+            size=None,
+            annotations=None,
+            meta=None,
+        ),
         types.Resource(
             uri=AnyUrl("desk3://market/calendar"),
             name="Economic Calendar / 经济日历",
@@ -388,6 +855,12 @@ async def handle_list_resources() -> list[types.Resource]:
     ]
     return resources
 
+def resource_params(uri: AnyUrl) -> dict[str, Any]:
+    """
+    Canonical query parameters of a resource URI.
+    """
+    return canonical_arguments({qp[0]: qp[1] for qp in uri.query_params()})
+
 @server.read_resource()
 async def handle_read_resource(uri: AnyUrl) -> str:
     if uri.scheme != "desk3":
@@ -396,7 +869,7 @@ async def handle_read_resource(uri: AnyUrl) -> str:
     match uri.path:
         case "/suggest":
             try:
-                query_params = {qp[0]: qp[1] for qp in uri.query_params()}
+                query_params = resource_params(uri)
                 chainid = query_params.get("chainid")
                 if not chainid:
                     raise ValueError("Missing required query param: chainid")
@@ -404,31 +877,54 @@ async def handle_read_resource(uri: AnyUrl) -> str:
                 return json.dumps(data, indent=2)
             except Exception as e:
                 raise RuntimeError(f"Failed to fetch suggest gas data: {e}")
+        case "/table":
+            try:
+                query_params = resource_params(uri)
+                chainids = query_params.get("chainids")
+                chainids = [c.strip() for c in chainids.split(",") if c.strip()] if chainids else None
+                data = await get_gas_table(chainids)
+                return json.dumps(data, indent=2)
+            except Exception as e:
+                raise RuntimeError(f"Failed to fetch gas table data: {e}")
         case "/exchangeRate":
             try:
-                data = await get_exchange_rate()
+                query_params = resource_params(uri)
+                data = apply_query(await get_exchange_rate(), query_params)
                 return json.dumps(data, indent=2)
             except Exception as e:
                 raise RuntimeError(f"Failed to fetch exchange rate data: {e}")
         case "/mini/24hr":
             try:
-                query_params = {qp[0]: qp[1] for qp in uri.query_params()}
+                query_params = resource_params(uri)
                 symbol = query_params.get("symbol")
-                data = await get_mini_24hr(symbol=symbol)
+                data = await fetch_list("/mini/24hr", lambda: get_mini_24hr_indexed(symbol=symbol), query_params)
+                data = deliver_document("/mini/24hr", data, query_params)
                 return json.dumps(data, indent=2)
             except Exception as e:
                 raise RuntimeError(f"Failed to fetch mini 24hr data: {e}")
+        case "/top-movers":
+            try:
+                query_params = resource_params(uri)
+                data = await get_top_movers(
+                    key=query_params.get("key", "change"),
+                    order=query_params.get("order", "desc"),
+                    limit=int(query_params.get("limit", 10)),
+                    quote=query_params.get("quote"),
+                )
+                return json.dumps(data, indent=2)
+            except Exception as e:
+                raise RuntimeError(f"Failed to fetch top movers data: {e}")
         case "/price":
             try:
-                query_params = {qp[0]: qp[1] for qp in uri.query_params()}
+                query_params = resource_params(uri)
                 symbol = query_params.get("symbol")
-                data = await get_token_price(symbol=symbol)
+                data = await fetch_list("/price", lambda: get_token_price(symbol=symbol), query_params)
                 return json.dumps(data, indent=2)
             except Exception as e:
                 raise RuntimeError(f"Failed to fetch token price data: {e}")
         case "/circulating":
             try:
-                query_params = {qp[0]: qp[1] for qp in uri.query_params()}
+                query_params = resource_params(uri)
                 symbol = query_params.get("symbol")
                 if not symbol:
                     raise ValueError("Missing required query param: symbol")
@@ -444,13 +940,15 @@ async def handle_read_resource(uri: AnyUrl) -> str:
                 raise RuntimeError(f"Failed to fetch fear & greed index: {e}")
         case "/btc/trend":
             try:
-                data = await get_btc_trend()
+                query_params = resource_params(uri)
+                data = await fetch_list("/btc/trend", lambda: get_btc_trend(), query_params)
                 return json.dumps(data, indent=2)
             except Exception as e:
                 raise RuntimeError(f"Failed to fetch BTC trend data: {e}")
         case "/eth/trend":
             try:
-                data = await get_eth_trend()
+                query_params = resource_params(uri)
+                data = await fetch_list("/eth/trend", lambda: get_eth_trend(), query_params)
                 return json.dumps(data, indent=2)
             except Exception as e:
                 raise RuntimeError(f"Failed to fetch ETH trend data: {e}")
@@ -468,7 +966,9 @@ async def handle_read_resource(uri: AnyUrl) -> str:
                 raise RuntimeError(f"Failed to fetch Bitcoin dominance data: {e}")
         case "/cycle/indicators":
             try:
-                data = await get_cycle_indicators()
+                query_params = resource_params(uri)
+                data = apply_query(await get_cycle_indicators(), query_params)
+                data = deliver_document("/cycle/indicators", data, query_params)
                 return json.dumps(data, indent=2)
             except Exception as e:
                 raise RuntimeError(f"Failed to fetch cycle indicators data: {e}")
@@ -496,11 +996,24 @@ async def handle_read_resource(uri: AnyUrl) -> str:
                 return json.dumps(data, indent=2)
             except Exception as e:
                 raise RuntimeError(f"Failed to fetch cycles data: {e}")
+        case "/changes":
+            try:
+                query_params = resource_params(uri)
+                data = await get_changes(
+                    since=query_params.get("since"),
+                    sources=query_params.get("sources"),
+                    min_change_pct=query_params.get("min_change_pct"),
+                )
+                return json.dumps(data, indent=2)
+            except Exception as e:
+                raise RuntimeError(f"Failed to fetch changes: {e}")
         case "/calendar":
             try:
-                query_params = {qp[0]: qp[1] for qp in uri.query_params()}
-                date = query_params.get("date")
-                data = await get_market_calendar(date=date)
+                query_params = resource_params(uri)
+                if has_calendar_query(query_params):
+                    data = await query_market_calendar(query_params)
+                else:
+                    data = await get_market_calendar(date=query_params.get("date"))
                 return json.dumps(data, indent=2)
             except Exception as e:
                 raise RuntimeError(f"Failed to fetch market calendar data: {e}")
@@ -514,6 +1027,13 @@ async def handle_list_tools() -> list[types.Tool]:
     List available tools.
     Each tool specifies its arguments using JSON Schema validation.
     """
+    return tool_definitions()
+
+@functools.cache
+def tool_definitions() -> list[types.Tool]:
+    """
+    Build the static tool list once per process.
+    """
     tools = [
         types.Tool(
             name="get_suggest_gas",
@@ -531,12 +1051,66 @@ async def handle_list_tools() -> list[types.Tool]:
                 "required": ["chainid"],
             },
         ),
+        types.Tool(
+            name="get_gas_table",
+            description="Get EIP1559 estimated gas info for several chains in one call. Warm chains are served from memory",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "chainids": {
+                        "type": "array",
+                        "description": "Chain IDs to include (e.g. [\"1\", \"56\", \"137\", \"42161\"]). Leave empty for the warm chains",
+                        "items": {"type": "string", "pattern": "^[0-9]+$"},
+                        "examples": [["1", "56", "137", "42161"]],
+                    },
+                },
+                "required": [],
+            },
+        ),
         types.Tool(
             name="get_exchange_rate",
             description="Get list of fiat currency exchange rates",
             inputSchema={
                 "type": "object",
-                "properties": {},
+                "properties": {**QUERY_SCHEMA_PROPERTIES},
+                "required": [],
+            },
+        ),
+        types.Tool(
+            name="convert",
+            description="Price tokens or fiat amounts in any fiat currency using the server's cached exchange rate table. Supports batched conversions",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "token": {
+                        "type": "string",
+                        "description": "Token (e.g. BTC), trading pair (e.g. BTCUSDT) or fiat currency code (e.g. USD)",
+                        "examples": ["BTC", "ETH", "USD"],
+                    },
+                    "currency": {
+                        "type": "string",
+                        "description": "Target fiat currency code",
+                        "examples": ["USD", "EUR", "CNY"],
+                    },
+                    "amount": {
+                        "type": "number",
+                        "description": "Amount of token to convert (default 1)",
+                        "default": 1,
+                    },
+                    "conversions": {
+                        "type": "array",
+                        "description": "Batch of conversions, used instead of token/currency/amount",
+                        "items": {
+                            "type": "object",
+                            "properties": {
+                                "token": {"type": "string"},
+                                "currency": {"type": "string"},
+                                "amount": {"type": "number"},
+                            },
+                            "required": ["token", "currency"],
+                        },
+                    },
+                },
                 "required": [],
             },
         ),
@@ -548,9 +1122,47 @@ async def handle_list_tools() -> list[types.Tool]:
                 "properties": {
                     "symbol": {
                         "type": "string",
-                        "description": "Trading pair symbol in format like BTCUSDT, ETHUSDT, etc. Leave empty to get all symbols.",
-                        "examples": ["BTCUSDT", "ETHUSDT", "BNBUSDT"],
-                        "pattern": "^[A-Z0-9]+$"
+                        "description": "Trading pair symbol in format like BTCUSDT, ETHUSDT, etc., comma separated for multiple. Leave empty to get all symbols.",
+                        "examples": ["BTCUSDT", "ETHUSDT", "BTCUSDT,ETHUSDT"],
+                        "pattern": "^[A-Za-z0-9, ]+$"
+                    },
+                    **QUERY_SCHEMA_PROPERTIES,
+                    **PAGINATION_SCHEMA_PROPERTIES,
+                    **DELTA_SCHEMA_PROPERTIES,
+                },
+                "required": [],
+            },
+        ),
+        types.Tool(
+            name="get_top_movers",
+            description="Get top 24hr gainers, losers, volume or price leaders without pulling the whole ticker universe",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "key": {
+                        "type": "string",
+                        "description": "Ranking key: change (24h percent change), volume (quote volume) or price (last price)",
+                        "enum": list(LEADERBOARD_KEYS),
+                        "default": "change",
+                    },
+                    "order": {
+                        "type": "string",
+                        "description": "desc for gainers/leaders, asc for losers/laggards",
+                        "enum": ["desc", "asc"],
+                        "default": "desc",
+                    },
+                    "limit": {
+                        "type": "integer",
+                        "description": "Number of rows to return",
+                        "minimum": 1,
+                        "maximum": 100,
+                        "default": 10,
+                    },
+                    "quote": {
+                        "type": "string",
+                        "description": "Only include pairs quoted in this asset, e.g. USDT",
+                        "examples": ["USDT", "BTC"],
+                        "pattern": "^[A-Za-z0-9]+$"
                     },
                 },
                 "required": [],
@@ -564,10 +1176,12 @@ async def handle_list_tools() -> list[types.Tool]:
                 "properties": {
                     "symbol": {
                         "type": "string",
-                        "description": "Trading pair symbol in format like BTCUSDT, ETHUSDT, etc. Leave empty to get all symbols",
-                        "examples": ["BTCUSDT", "ETHUSDT", "BNBUSDT"],
-                        "pattern": "^[A-Z0-9]+$"
+                        "description": "Trading pair symbol in format like BTCUSDT, ETHUSDT, etc., comma separated for multiple. Leave empty to get all symbols",
+                        "examples": ["BTCUSDT", "ETHUSDT", "BTCUSDT,ETHUSDT"],
+                        "pattern": "^[A-Za-z0-9, ]+$"
                     },
+                    **QUERY_SCHEMA_PROPERTIES,
+                    **PAGINATION_SCHEMA_PROPERTIES,
                 },
                 "required": [],
             },
@@ -582,7 +1196,7 @@ async def handle_list_tools() -> list[types.Tool]:
                         "type": "string",
                         "description": "Trading pair symbol (required), format BTC -> BTCUSDT, ETH -> ETHUSDT",
                         "examples": ["BTCUSDT", "ETHUSDT", "BNBUSDT"],
-                        "pattern": "^[A-Z0-9]+$"
+                        "pattern": "^[A-Za-z0-9]+$"
                     },
                 },
                 "required": ["symbol"],
@@ -602,7 +1216,7 @@ async def handle_list_tools() -> list[types.Tool]:
             description="Get BTC trend chart for the past 3 months. Format: [[date, price, active addresses, new addresses, transaction addresses]]",
             inputSchema={
                 "type": "object",
-                "properties": {},
+                "properties": {**QUERY_SCHEMA_PROPERTIES, **PAGINATION_SCHEMA_PROPERTIES},
                 "required": [],
             },
         ),
@@ -611,7 +1225,7 @@ async def handle_list_tools() -> list[types.Tool]:
             description="Get the ETH trend chart for the past three months. Format: [[date, price, active addresses, new addresses]]",
             inputSchema={
                 "type": "object",
-                "properties": {},
+                "properties": {**QUERY_SCHEMA_PROPERTIES, **PAGINATION_SCHEMA_PROPERTIES},
                 "required": [],
             },
         ),
@@ -638,7 +1252,7 @@ async def handle_list_tools() -> list[types.Tool]:
             description="Get crypto market cycle top indicators with fields (Indicator/Current/24h%/ReferencePrice/Triggered). Provides comprehensive market cycle analysis including Bitcoin Ahr999 Index, Pi Cycle Top Indicator, Puell Multiple, Bitcoin Rainbow Chart, and more",
             inputSchema={
                 "type": "object",
-                "properties": {},
+                "properties": {**QUERY_SCHEMA_PROPERTIES, **DELTA_SCHEMA_PROPERTIES},
                 "required": [],
             },
         ),
@@ -678,6 +1292,15 @@ async def handle_list_tools() -> list[types.Tool]:
                 "required": [],
             },
         ),
+        types.Tool(
+            name="get_changes",
+            description="Cheap polling for cycle indicators, cycles, fear & greed and altcoin season: returns only the transitions since the token of the previous call (indicator Triggered flips, index band crossings, status changes), or an empty list if nothing changed. Call without since first to get a token",
+            inputSchema={
+                "type": "object",
+                "properties": {**CHANGES_SCHEMA_PROPERTIES},
+                "required": [],
+            },
+        ),
         types.Tool(
             name="get_market_calendar",
             description="Get economic calendar for specified month. Shows important market or political events. Parameter: date (optional) in format YYYY-MM (e.g., 2025-09). If not provided, returns current month data / 获取指定月份的经济日历，重要市场或政治事件。参数：date（可选）格式 YYYY-MM（如 2025-09），不传参表示获取当前月份",
@@ -690,6 +1313,7 @@ async def handle_list_tools() -> list[types.Tool]:
                         "examples": ["2025-09", "2025-10", "2025-01"],
                         "pattern": "^[0-9]{4}-[0-9]{2}$"
                     },
+                    **CALENDAR_QUERY_SCHEMA_PROPERTIES,
                 },
                 "required": [],
             },
@@ -705,6 +1329,9 @@ async def handle_call_tool(
     Handle tool execution requests.
     Tools can modify server state and notify clients of changes.
     """
+    # Same normalization as resource query parameters
+    arguments = canonical_arguments(arguments)
+    observe_call(name, arguments)
 
     match name:
         case "get_suggest_gas":
@@ -721,9 +1348,21 @@ async def handle_call_tool(
                 ]
             except Exception as e:
                 raise RuntimeError(f"Failed to fetch suggest gas data: {e}")
+        case "get_gas_table":
+            chainids = arguments.get("chainids") if arguments else None
+            try:
+                data = await get_gas_table(chainids)
+                return [
+                    types.TextContent(
+                        type="text",
+                        text=json.dumps(data, indent=2),
+                    )
+                ]
+            except Exception as e:
+                raise RuntimeError(f"Failed to fetch gas table data: {e}")
         case "get_exchange_rate":
             try:
-                data = await get_exchange_rate()
+                data = apply_query(await get_exchange_rate(), arguments)
                 return [
                     types.TextContent(
                         type="text",
@@ -732,10 +1371,32 @@ async def handle_call_tool(
                 ]
             except Exception as e:
                 raise RuntimeError(f"Failed to fetch exchange rate data: {e}")
+        case "convert":
+            arguments = arguments or {}
+            conversions = arguments.get("conversions")
+            if not conversions:
+                if "token" not in arguments or "currency" not in arguments:
+                    raise ValueError("Missing required arguments: token and currency, or conversions")
+                conversions = [{
+                    "token": arguments["token"],
+                    "currency": arguments["currency"],
+                    "amount": arguments.get("amount", 1),
+                }]
+            try:
+                data = await convert(conversions)
+                return [
+                    types.TextContent(
+                        type="text",
+                        text=json.dumps(data, indent=2),
+                    )
+                ]
+            except Exception as e:
+                raise RuntimeError(f"Failed to convert: {e}")
         case "get_mini_24hr":
             symbol = arguments.get("symbol") if arguments else None
             try:
-                data = await get_mini_24hr(symbol=symbol)
+                data = await fetch_list("/mini/24hr", lambda: get_mini_24hr_indexed(symbol=symbol), arguments)
+                data = deliver_document("/mini/24hr", data, arguments)
                 return [
                     types.TextContent(
                         type="text",
@@ -744,10 +1405,27 @@ async def handle_call_tool(
                 ]
             except Exception as e:
                 raise RuntimeError(f"Failed to fetch mini 24hr data: {e}")
+        case "get_top_movers":
+            arguments = arguments or {}
+            try:
+                data = await get_top_movers(
+                    key=arguments.get("key", "change"),
+                    order=arguments.get("order", "desc"),
+                    limit=int(arguments.get("limit", 10)),
+                    quote=arguments.get("quote"),
+                )
+                return [
+                    types.TextContent(
+                        type="text",
+                        text=json.dumps(data, indent=2),
+                    )
+                ]
+            except Exception as e:
+                raise RuntimeError(f"Failed to fetch top movers data: {e}")
         case "get_token_price":
             symbol = arguments.get("symbol") if arguments else None
             try:
-                data = await get_token_price(symbol=symbol)
+                data = await fetch_list("/price", lambda: get_token_price(symbol=symbol), arguments)
                 return [
                     types.TextContent(
                         type="text",
@@ -783,7 +1461,7 @@ async def handle_call_tool(
                 raise RuntimeError(f"Failed to fetch fear & greed index: {e}")
         case "get_btc_trend":
             try:
-                data = await get_btc_trend()
+                data = await fetch_list("/btc/trend", lambda: get_btc_trend(), arguments)
                 return [
                     types.TextContent(
                         type="text",
@@ -794,7 +1472,7 @@ async def handle_call_tool(
                 raise RuntimeError(f"Failed to fetch BTC trend data: {e}")
         case "get_eth_trend":
             try:
-                data = await get_eth_trend()
+                data = await fetch_list("/eth/trend", lambda: get_eth_trend(), arguments)
                 return [
                     types.TextContent(
                         type="text",
@@ -827,7 +1505,8 @@ async def handle_call_tool(
                 raise RuntimeError(f"Failed to fetch Bitcoin dominance data: {e}")
         case "get_cycle_indicators":
             try:
-                data = await get_cycle_indicators()
+                data = apply_query(await get_cycle_indicators(), arguments)
+                data = deliver_document("/cycle/indicators", data, arguments)
                 return [
                     types.TextContent(
                         type="text",
@@ -880,10 +1559,29 @@ async def handle_call_tool(
                 ]
             except Exception as e:
                 raise RuntimeError(f"Failed to fetch cycles data: {e}")
+        case "get_changes":
+            arguments = arguments or {}
+            try:
+                data = await get_changes(
+                    since=arguments.get("since"),
+                    sources=arguments.get("sources"),
+                    min_change_pct=arguments.get("min_change_pct"),
+                )
+                return [
+                    types.TextContent(
+                        type="text",
+                        text=json.dumps(data, indent=2),
+                    )
+                ]
+            except Exception as e:
+                raise RuntimeError(f"Failed to fetch changes: {e}")
         case "get_market_calendar":
             date = arguments.get("date") if arguments else None
             try:
-                data = await get_market_calendar(date=date)
+                if has_calendar_query(arguments):
+                    data = await query_market_calendar(arguments)
+                else:
+                    data = await get_market_calendar(date=date)
                 return [
                     types.TextContent(
                         type="text",
@@ -897,6 +1595,8 @@ async def handle_call_tool(
 
 
 async def main():
+    import mcp.server.stdio
+
     # Run the server using stdin/stdout streams
     async with mcp.server.stdio.stdio_server() as (read_stream, write_stream):
         await server.run(
@@ -1,6 +1,7 @@
 from starlette.applications import Starlette
 from starlette.routing import Route, Mount
-from starlette.responses import Response
+from starlette.middleware import Middleware
+from starlette.responses import JSONResponse, Response
 from mcp.server.sse import SseServerTransport
 from mcp.server import Server
 # Local fallback for NotificationOptions if not available in mcp.server
@@ -16,13 +17,35 @@ except ImportError:
 from mcp.server.models import InitializationOptions
 import mcp.types as types
 import asyncio
-from .server import server
+from .admission import Overloaded, admission_from_env, install_fair_scheduler, scheduler_from_env
+from .compression import CompressionMiddleware, compression_from_env
+from .drain import drainer_from_env
+from .server import prefetcher, response_cache, server, shutdown, warm_up
 
 # 4. Initialize SSE transport layer
 sse = SseServerTransport("/messages/")
 
+# Fair scheduling of tool calls across sessions, and admission control for new sessions
+scheduler = scheduler_from_env()
+install_fair_scheduler(server, scheduler)
+admission = admission_from_env()
+
+# Warm up before reporting ready; drain on SIGTERM instead of dropping sessions
+drainer = drainer_from_env(admission, scheduler, warm_up=warm_up, shutdown=shutdown, close=response_cache.close)
+
+# Negotiated zstd/br/gzip compression of responses and SSE streams
+compression = compression_from_env()
+
 # 5. SSE connection handler
 async def handle_sse(request):
+    try:
+        async with admission.session():
+            await run_sse_session(request)
+    except Overloaded as e:
+        return Response(str(e), status_code=503, headers={"Retry-After": drainer.retry_after()})
+    return Response()
+
+async def run_sse_session(request):
     async with sse.connect_sse(request.scope, request.receive, request._send) as streams:
         await server.run(
             streams[0],
@@ -35,16 +58,32 @@ async def handle_sse(request):
                 )
             )
         )
-    return Response()
+
+# Queue time and load metrics
+async def handle_metrics(request):
+    return JSONResponse({
+        "sessions": admission.metrics(),
+        "requests": scheduler.metrics(),
+        "compression": compression.metrics(),
+        "cache": response_cache.stats,
+        "prefetch": prefetcher.metrics(),
+    })
 
 # 6. Starlette routes
 routes = [
     Route("/sse", endpoint=handle_sse, methods=["GET"]),
+    Route("/metrics", endpoint=handle_metrics, methods=["GET"]),
+    Route("/healthz", endpoint=drainer.handle_healthz, methods=["GET"]),
+    Route("/readyz", endpoint=drainer.handle_readyz, methods=["GET"]),
     Mount("/messages/", app=sse.handle_post_message),
 ]
 
 # 7. Create Starlette application
-starlette_app = Starlette(routes=routes)
+starlette_app = Starlette(
+    routes=routes,
+    middleware=[Middleware(CompressionMiddleware, compression=compression)],
+    lifespan=drainer.lifespan,
+)
 
 # 8. Start (using uvicorn)
 if __name__ == "__main__":
@@ -0,0 +1,178 @@
+import asyncio
+
+import pytest
+
+from desk3_service.admission import AdmissionController, FairScheduler, Overloaded
+
+
+async def run_request(scheduler: FairScheduler, session: str, order: list, hold: asyncio.Event | None = None):
+    async with scheduler.slot(session):
+        order.append(session)
+        if hold is not None:
+            await hold.wait()
+        await asyncio.sleep(0)
+
+
+def test_round_robin_across_sessions():
+    async def scenario():
+        scheduler = FairScheduler(max_inflight=1, per_session_limit=1)
+        order = []
+        hold = asyncio.Event()
+        blocker = asyncio.create_task(run_request(scheduler, "warmup", order, hold))
+        await asyncio.sleep(0)
+        chatty = [asyncio.create_task(run_request(scheduler, "chatty", order)) for _ in range(6)]
+        await asyncio.sleep(0)
+        quiet = [asyncio.create_task(run_request(scheduler, "quiet", order)) for _ in range(2)]
+        await asyncio.sleep(0)
+        hold.set()
+        await asyncio.gather(blocker, *chatty, *quiet)
+        return order
+
+    order = asyncio.run(scenario())
+    # The quiet session does not wait behind all of the chatty session's queued requests
+    assert order[1:5] == ["chatty", "quiet", "chatty", "quiet"]
+
+
+def test_weight_gives_consecutive_grants():
+    async def scenario():
+        scheduler = FairScheduler(max_inflight=1, per_session_limit=1)
+        scheduler.set_weight("heavy", 2)
+        order = []
+        hold = asyncio.Event()
+        blocker = asyncio.create_task(run_request(scheduler, "warmup", order, hold))
+        await asyncio.sleep(0)
+        tasks = [asyncio.create_task(run_request(scheduler, "heavy", order)) for _ in range(4)]
+        tasks += [asyncio.create_task(run_request(scheduler, "light", order)) for _ in range(2)]
+        await asyncio.sleep(0)
+        hold.set()
+        await asyncio.gather(blocker, *tasks)
+        return order
+
+    order = asyncio.run(scenario())
+    assert order[1:] == ["heavy", "heavy", "light", "heavy", "heavy", "light"]
+
+
+def test_per_session_limit():
+    async def scenario():
+        scheduler = FairScheduler(max_inflight=10, per_session_limit=2)
+        hold = asyncio.Event()
+        tasks = [asyncio.create_task(run_request(scheduler, "a", [], hold)) for _ in range(5)]
+        await asyncio.sleep(0.01)
+        during = scheduler.metrics()
+        hold.set()
+        await asyncio.gather(*tasks)
+        return during, scheduler.metrics()
+
+    during, after = asyncio.run(scenario())
+    assert during["active"] == 2
+    assert during["queued"] == 3
+    assert after["active"] == 0
+    assert after["sessions"] == 0
+
+
+def test_cancelled_waiter_is_removed():
+    async def scenario():
+        scheduler = FairScheduler(max_inflight=1, per_session_limit=1)
+        hold = asyncio.Event()
+        running = asyncio.create_task(run_request(scheduler, "a", [], hold))
+        await asyncio.sleep(0)
+        queued = asyncio.create_task(run_request(scheduler, "b", []))
+        await asyncio.sleep(0)
+        assert scheduler.metrics()["queued"] == 1
+        queued.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await queued
+        during = scheduler.metrics()
+        hold.set()
+        await running
+        return during
+
+    during = asyncio.run(scenario())
+    assert during["queued"] == 0
+    assert during["sessions"] == 1
+
+
+def test_too_many_queued_requests_rejected():
+    async def scenario():
+        scheduler = FairScheduler(max_inflight=1, per_session_limit=1, max_queued_per_session=1)
+        hold = asyncio.Event()
+        running = asyncio.create_task(run_request(scheduler, "a", [], hold))
+        await asyncio.sleep(0)
+        queued = asyncio.create_task(run_request(scheduler, "a", []))
+        await asyncio.sleep(0)
+        with pytest.raises(Overloaded):
+            await run_request(scheduler, "a", [])
+        hold.set()
+        await asyncio.gather(running, queued)
+        return scheduler.metrics()
+
+    metrics = asyncio.run(scenario())
+    assert metrics["rejected"] == 1
+    assert metrics["sessions"] == 0
+
+
+async def open_session(admission: AdmissionController, admitted: list, hold: asyncio.Event):
+    async with admission.session():
+        admitted.append(True)
+        await hold.wait()
+
+
+def test_admission_queues_then_admits():
+    async def scenario():
+        admission = AdmissionController(max_sessions=1, max_waiting=1, wait_timeout=1.0)
+        admitted = []
+        first_hold, second_hold = asyncio.Event(), asyncio.Event()
+        first = asyncio.create_task(open_session(admission, admitted, first_hold))
+        await asyncio.sleep(0)
+        second = asyncio.create_task(open_session(admission, admitted, second_hold))
+        await asyncio.sleep(0)
+        waiting = admission.metrics()["waiting"]
+        with pytest.raises(Overloaded, match="Too many sessions"):
+            await open_session(admission, admitted, asyncio.Event())
+        first_hold.set()
+        await first
+        await asyncio.sleep(0)
+        second_hold.set()
+        await second
+        return waiting, admitted, admission.metrics()
+
+    waiting, admitted, metrics = asyncio.run(scenario())
+    assert waiting == 1
+    assert len(admitted) == 2
+    assert metrics["active"] == 0
+    assert metrics["rejected"] == 1
+
+
+def test_admission_wait_times_out():
+    async def scenario():
+        admission = AdmissionController(max_sessions=1, max_waiting=1, wait_timeout=0.05)
+        hold = asyncio.Event()
+        first = asyncio.create_task(open_session(admission, [], hold))
+        await asyncio.sleep(0)
+        with pytest.raises(Overloaded, match="Timed out"):
+            await open_session(admission, [], asyncio.Event())
+        hold.set()
+        await first
+
+    asyncio.run(scenario())
+
+
+def test_closed_admission_rejects_waiting_and_new_sessions():
+    async def scenario():
+        admission = AdmissionController(max_sessions=1, max_waiting=1, wait_timeout=1.0)
+        hold = asyncio.Event()
+        first = asyncio.create_task(open_session(admission, [], hold))
+        await asyncio.sleep(0)
+        waiting = asyncio.create_task(open_session(admission, [], asyncio.Event()))
+        await asyncio.sleep(0)
+        await admission.close()
+        with pytest.raises(Overloaded, match="draining"):
+            await waiting
+        with pytest.raises(Overloaded, match="draining"):
+            await open_session(admission, [], asyncio.Event())
+        # Sessions that were already open are not affected
+        assert not first.done()
+        hold.set()
+        await first
+
+    asyncio.run(scenario())
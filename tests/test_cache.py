@@ -0,0 +1,246 @@
+import asyncio
+import socket
+import threading
+import time
+
+import pytest
+
+from desk3_service.cache import LocalKVServer, MemoryBackend, RespBackend, ResponseCache
+
+
+class Upstream:
+    """
+    Blocking fetch function counting its calls, as passed to get_or_fetch.
+    """
+
+    def __init__(self, value=None, delay: float = 0.0, error: Exception | None = None):
+        self.value = value
+        self.delay = delay
+        self.error = error
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def __call__(self):
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        return self.value
+
+
+def closed_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def test_leader_election_across_replicas():
+    async def scenario():
+        async with LocalKVServer() as kv:
+            replicas = [ResponseCache(RespBackend(kv.url)) for _ in range(2)]
+            upstream = Upstream({"price": 1}, delay=0.2)
+            results = await asyncio.gather(
+                *(replica.get_or_fetch("/price", 10, upstream) for replica in replicas)
+            )
+            for replica in replicas:
+                await replica.close()
+            return upstream, results, replicas
+
+    upstream, results, replicas = asyncio.run(scenario())
+    assert upstream.calls == 1
+    assert results == [{"price": 1}, {"price": 1}]
+    assert sorted(replica.stats["upstream"] for replica in replicas) == [0, 1]
+
+
+def test_fresh_value_served_from_shared_backend():
+    async def scenario():
+        async with LocalKVServer() as kv:
+            first, second = ResponseCache(RespBackend(kv.url)), ResponseCache(RespBackend(kv.url))
+            upstream = Upstream([1, 2, 3])
+            await first.get_or_fetch("/mini/24hr", 10, upstream)
+            value = await second.get_or_fetch("/mini/24hr", 10, upstream)
+            await first.close()
+            await second.close()
+            return upstream, value, second
+
+    upstream, value, second = asyncio.run(scenario())
+    assert value == [1, 2, 3]
+    assert upstream.calls == 1
+    assert second.stats["hits"] == 1
+
+
+def test_lock_release_keeps_other_owner():
+    async def scenario():
+        async with LocalKVServer() as kv:
+            backend = RespBackend(kv.url)
+            assert await backend.acquire_lock("lock:/price", "a", 0.05)
+            await asyncio.sleep(0.1)
+            # a's lock expired and b took it; a's late release must not drop b's lock
+            assert await backend.acquire_lock("lock:/price", "b", 10)
+            await backend.release_lock("lock:/price", "a")
+            held = await backend.get("lock:/price")
+            await backend.release_lock("lock:/price", "b")
+            released = await backend.get("lock:/price")
+            await backend.close()
+            return held, released
+
+    held, released = asyncio.run(scenario())
+    assert held == b"b"
+    assert released is None
+
+
+def test_stale_value_served_when_upstream_fails():
+    async def scenario():
+        cache = ResponseCache(MemoryBackend())
+        await cache.get_or_fetch("/fear-greed", 0.05, Upstream({"value": 40}))
+        await asyncio.sleep(0.1)
+        value = await cache.get_or_fetch("/fear-greed", 0.05, Upstream(error=RuntimeError("down")))
+        return cache, value
+
+    cache, value = asyncio.run(scenario())
+    assert value == {"value": 40}
+    assert cache.stats["stale"] == 1
+
+
+def test_stale_value_not_served_past_stale_factor():
+    async def scenario():
+        cache = ResponseCache(MemoryBackend())
+        await cache.get_or_fetch("/fear-greed", 0.02, Upstream({"value": 40}))
+        await asyncio.sleep(0.02 * ResponseCache.STALE_FACTOR + 0.05)
+        await cache.get_or_fetch("/fear-greed", 0.02, Upstream(error=RuntimeError("down")))
+
+    with pytest.raises(RuntimeError, match="down"):
+        asyncio.run(scenario())
+
+
+def test_backend_refusing_connections_is_skipped():
+    async def scenario():
+        backend = RespBackend(f"redis://127.0.0.1:{closed_port()}", retry_after=60)
+        cache = ResponseCache(backend)
+        upstream = Upstream({"rate": 1})
+        value = await cache.get_or_fetch("/exchangeRate", 10, upstream)
+        available = backend.available
+        started = time.monotonic()
+        reply = await backend.get("/exchangeRate")
+        return upstream, value, available, reply, time.monotonic() - started
+
+    upstream, value, available, reply, elapsed = asyncio.run(scenario())
+    assert value == {"rate": 1}
+    assert upstream.calls == 1
+    assert not available
+    assert reply is None
+    assert elapsed < 0.05
+
+
+def test_blackholed_backend_costs_one_timeout():
+    async def scenario():
+        async def never_reply(reader, writer):
+            await reader.read()
+            writer.close()
+
+        blackhole = await asyncio.start_server(never_reply, "127.0.0.1", 0)
+        port = blackhole.sockets[0].getsockname()[1]
+        backend = RespBackend(f"redis://127.0.0.1:{port}", timeout=0.2)
+        cache = ResponseCache(backend)
+        started = time.monotonic()
+        values = await asyncio.gather(
+            *(cache.get_or_fetch(f"/price?{i}", 10, Upstream(i)) for i in range(10))
+        )
+        elapsed = time.monotonic() - started
+        await backend.close()
+        blackhole.close()
+        await blackhole.wait_closed()
+        return values, elapsed
+
+    values, elapsed = asyncio.run(scenario())
+    assert values == list(range(10))
+    # get, lock, set and release are skipped once the first timeout opened the circuit
+    assert elapsed < 0.6
+
+
+def test_cancelled_leader_does_not_strand_waiters():
+    async def scenario():
+        cache = ResponseCache(MemoryBackend())
+        upstream = Upstream({"price": 1}, delay=0.1)
+        leader = asyncio.create_task(cache.get_or_fetch("/price", 10, upstream))
+        await asyncio.sleep(0.01)
+        follower = asyncio.create_task(cache.get_or_fetch("/price", 10, upstream))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        value = await asyncio.wait_for(follower, 1)
+        return leader.cancelled(), value, upstream, cache
+
+    cancelled, value, upstream, cache = asyncio.run(scenario())
+    assert cancelled
+    assert value == {"price": 1}
+    assert upstream.calls == 1
+    assert not cache._inflight
+
+
+class CountingBackend(MemoryBackend):
+    """
+    Memory backend posing as shared, counting reads.
+    """
+
+    shared = True
+
+    def __init__(self):
+        super().__init__()
+        self.gets = 0
+
+    async def get(self, key: str) -> bytes | None:
+        self.gets += 1
+        return await super().get(key)
+
+
+def test_fresh_local_value_skips_backend():
+    async def scenario():
+        backend = CountingBackend()
+        cache = ResponseCache(backend)
+        upstream = Upstream({"price": 1})
+        for _ in range(5):
+            await cache.get_or_fetch("/price", 10, upstream)
+        return backend.gets, upstream.calls
+
+    gets, calls = asyncio.run(scenario())
+    assert calls == 1
+    assert gets == 1
+
+
+def test_memory_backend_keeps_values_only_in_process():
+    async def scenario():
+        backend = MemoryBackend()
+        cache = ResponseCache(backend)
+        await cache.get_or_fetch("/price", 10, Upstream({"price": 1}))
+        return await backend.get("/price"), cache._local["/price"][1]
+
+    stored, local = asyncio.run(scenario())
+    assert stored is None
+    assert local == {"price": 1}
+
+
+def test_error_replies_treated_as_unavailable_backend():
+    async def scenario():
+        async def refuse_auth(reader, writer):
+            while await reader.readline():
+                writer.write(b"-NOAUTH Authentication required.\r\n")
+                await writer.drain()
+            writer.close()
+
+        server = await asyncio.start_server(refuse_auth, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        backend = RespBackend(f"redis://127.0.0.1:{port}")
+        cache = ResponseCache(backend)
+        upstream = Upstream({"rate": 1})
+        value = await cache.get_or_fetch("/exchangeRate", 10, upstream)
+        available = backend.available
+        await backend.close()
+        server.close()
+        await server.wait_closed()
+        return value, upstream.calls, available
+
+    value, calls, available = asyncio.run(scenario())
+    assert value == {"rate": 1}
+    assert calls == 1
+    assert not available
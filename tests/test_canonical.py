@@ -0,0 +1,45 @@
+from desk3_service.canonical import canonical_arguments, canonical_symbols, request_key
+
+
+def test_canonical_symbols():
+    assert canonical_symbols("ethusdt, BTCUSDT,BTCUSDT") == "BTCUSDT,ETHUSDT"
+    assert canonical_symbols("btcusdt ethusdt") == "BTCUSDT,ETHUSDT"
+    assert canonical_symbols(" , ") is None
+    assert canonical_symbols(None) is None
+
+
+def test_chain_lists_sorted_numerically_keeping_their_form():
+    assert canonical_arguments({"chainids": ["137", "1", "56", "1"]}) == {"chainids": ["1", "56", "137"]}
+    assert canonical_arguments({"chainids": "137, 1,56"}) == {"chainids": "1,56,137"}
+    assert canonical_arguments({"chainids": [1, 56]}) == {"chainids": ["1", "56"]}
+    assert canonical_arguments({"chainids": []}) == {}
+
+
+def test_codes_upper_cased_and_empty_values_dropped():
+    assert canonical_arguments({"quote": " usdt ", "currency": "eur", "token": "btc"}) == {
+        "quote": "USDT",
+        "currency": "EUR",
+        "token": "BTC",
+    }
+    assert canonical_arguments({"symbol": "", "limit": None, "filter": "  ", "sort": "-x"}) == {"sort": "-x"}
+    assert canonical_arguments(None) == {}
+
+
+def test_tool_call_and_resource_read_share_a_key():
+    tool = request_key("get_token_price", {"symbol": "ethusdt,btcusdt", "page_size": 10, "delta": True})
+    resource = request_key("/price", {"symbol": "BTCUSDT,ETHUSDT", "page_size": "10", "delta": "true"})
+    assert tool == resource
+    assert request_key("get_gas_table", {"chainids": ["56", "1"]}) == request_key("/table", {"chainids": "1,56"})
+
+
+def test_request_key_without_arguments_is_the_path():
+    assert request_key("get_cycles", None) == "/cycles"
+    assert request_key("/cycles", {"symbol": ""}) == "/cycles"
+    assert request_key("unknown_tool", {}) == "unknown_tool"
+
+
+def test_request_key_exclusions_and_distinct_selections():
+    paged = request_key("/mini/24hr", {"sort": "-quoteVolume", "cursor": "abc", "page_size": 50}, exclude=("cursor", "page_size"))
+    assert paged == request_key("/mini/24hr", {"sort": "-quoteVolume"})
+    assert request_key("/mini/24hr", {"sort": "-quoteVolume"}) != request_key("/mini/24hr", {"sort": "quoteVolume"})
+    assert request_key("/price", {"symbol": "BTCUSDT"}) != request_key("/price", {"symbol": "ETHUSDT"})
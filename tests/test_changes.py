@@ -0,0 +1,98 @@
+from desk3_service.changes import ChangeTracker, flatten_signals, moves, transitions
+
+
+def indicators(*rows: tuple[str, str]) -> dict:
+    return {"data": [{"Indicator": name, "Triggered": triggered, "UpdateTime": "now"} for name, triggered in rows]}
+
+
+def test_flatten_signals():
+    assert flatten_signals(indicators(("Pi Cycle", "false"), ("Puell", "true"))) == {
+        "Pi Cycle.Indicator": "Pi Cycle",
+        "Pi Cycle.Triggered": False,
+        "Puell.Indicator": "Puell",
+        "Puell.Triggered": True,
+    }
+    assert flatten_signals({"value": 20, "timestamp": 1, "nested": {"status": "Fear"}}) == {
+        "value": 20,
+        "nested.status": "Fear",
+    }
+    assert flatten_signals(42) == {"value": 42}
+
+
+def test_flatten_signals_skips_history():
+    history = [{"price": price} for price in range(60)]
+    assert flatten_signals({"current": 1, "history": history}) == {"current": 1}
+    assert flatten_signals({"recent": history[:3]}) == {"recent.0.price": 0, "recent.1.price": 1, "recent.2.price": 2}
+
+
+def test_transitions_flip_and_text_change():
+    old = {"Pi Cycle.Triggered": False, "status": "Accumulation", "price": 1.0}
+    new = {"Pi Cycle.Triggered": True, "status": "Markup", "price": 2.0, "added": True}
+    assert transitions("cycles", old, new) == [
+        {"source": "cycles", "signal": "Pi Cycle.Triggered", "type": "flip", "from": False, "to": True},
+        {"source": "cycles", "signal": "status", "type": "change", "from": "Accumulation", "to": "Markup"},
+    ]
+
+
+def test_transitions_band_crossing():
+    found = transitions("fear_greed", {"value": "44"}, {"value": "60"})
+    assert found == [{
+        "source": "fear_greed", "signal": "value", "type": "band",
+        "from": "Fear", "to": "Greed", "value_from": "44", "value_to": "60",
+    }]
+    # Moving within a band, or a source without bands, is not a transition
+    assert transitions("fear_greed", {"value": 30}, {"value": 40}) == []
+    assert transitions("cycles", {"value": 10}, {"value": 90}) == []
+
+
+def test_moves_with_min_change_pct():
+    old = {"a": 100, "b": "50", "c": 0, "d": 10}
+    new = {"a": 104, "b": "40", "c": 5, "d": 11}
+    # Moves from zero have no percentage and are never reported
+    found = moves("cycles", old, new, 15)
+    assert [(move["signal"], move["change_pct"]) for move in found] == [("b", -20.0)]
+    assert [move["signal"] for move in moves("cycles", old, new, 4)] == ["a", "b", "d"]
+
+
+def test_token_stable_while_nothing_changes():
+    tracker = ChangeTracker()
+    first = tracker.record({"fear_greed": {"value": 20, "timestamp": 1}})
+    again = tracker.record({"fear_greed": {"value": 20, "timestamp": 2}})
+    assert again is first
+    # A source missing from a later record keeps its last signals
+    assert tracker.record({}) is first
+    assert tracker.changes_since(first.token) == {"token": first.token, "since": first.token, "reset": False, "changes": []}
+
+
+def test_flip_and_reversal_both_reported():
+    tracker = ChangeTracker()
+    token = tracker.record({"cycle_indicators": indicators(("Pi Cycle", "false"))}).token
+    tracker.record({"cycle_indicators": indicators(("Pi Cycle", "true"))})
+    latest = tracker.record({"cycle_indicators": indicators(("Pi Cycle", "false"))})
+    result = tracker.changes_since(token)
+    assert result["token"] == latest.token
+    assert [(change["from"], change["to"]) for change in result["changes"]] == [(False, True), (True, False)]
+    # Measured end to end nothing moved
+    assert tracker.changes_since(token, min_change_pct=0)["changes"] == result["changes"]
+
+
+def test_unknown_token_resets():
+    tracker = ChangeTracker(max_snapshots=2)
+    first = tracker.record({"fear_greed": {"value": 20}}).token
+    assert tracker.changes_since(None)["reset"] is False
+    for value in (30, 40):
+        tracker.record({"fear_greed": {"value": value}})
+    result = tracker.changes_since(first)
+    assert result["reset"] is True
+    assert result["since"] is None and result["changes"] == []
+    assert tracker.changes_since("0000-1")["reset"] is True
+
+
+def test_sources_filter():
+    tracker = ChangeTracker()
+    token = tracker.record({"fear_greed": {"value": 20}, "altcoin_season": {"index": 20}}).token
+    tracker.record({"fear_greed": {"value": 80}, "altcoin_season": {"index": 80}})
+    changes = tracker.changes_since(token, sources=["altcoin_season"], min_change_pct=10)["changes"]
+    assert {change["source"] for change in changes} == {"altcoin_season"}
+    assert [change["type"] for change in changes] == ["band", "move"]
+    assert changes[0]["from"] == "Bitcoin Season" and changes[0]["to"] == "Altcoin Season"
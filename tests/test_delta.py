@@ -0,0 +1,136 @@
+from desk3_service.delta import DeltaTracker, diff_entries, document_key, keyed_entries, wants_delta
+
+
+class Session:
+    """
+    Stand-in for an MCP session; the tracker only needs a weakly referenceable object.
+    """
+
+
+def tickers(*rows: tuple[str, str]) -> list[dict]:
+    return [{"symbol": symbol, "lastPrice": price} for symbol, price in rows]
+
+
+def test_wants_delta():
+    assert not wants_delta(None)
+    assert not wants_delta({})
+    assert wants_delta({"delta": True})
+    assert wants_delta({"delta": "yes"})
+    assert not wants_delta({"delta": "false"})
+    # A since token turns delta mode on unless delta says otherwise
+    assert wants_delta({"since": "abc"})
+    assert not wants_delta({"since": "abc", "delta": False})
+
+
+def test_document_key_ignores_delivery_arguments():
+    plain = document_key("/price", {"symbol": "BTCUSDT"})
+    assert document_key("/price", {"symbol": "BTCUSDT", "delta": True, "since": "abc", "page_size": 10}) == plain
+    assert document_key("/price", {"symbol": "ETHUSDT"}) != plain
+
+
+def test_keyed_entries():
+    assert list(keyed_entries(tickers(("BTCUSDT", "1"), ("ETHUSDT", "2")))) == ["BTCUSDT", "ETHUSDT"]
+    assert list(keyed_entries({"data": [{"Indicator": "CPI"}]})) == ["CPI"]
+    # Rows without a key field are keyed by position, other documents by top-level field
+    assert list(keyed_entries([{"value": 1}, {"value": 2}])) == ["0", "1"]
+    assert keyed_entries({"fear": 20, "greed": 80}) == {"fear": 20, "greed": 80}
+    assert keyed_entries(42) == {"": 42}
+
+
+def test_diff_entries_carries_only_changed_fields():
+    old = {
+        "BTC": {"price": 1, "volume": 5, "note": "x"},
+        "ETH": {"price": 2},
+        "DOGE": {"price": 3},
+    }
+    new = {
+        "BTC": {"price": 1, "volume": 6},
+        "ETH": {"price": 2},
+        "SOL": {"price": 4},
+    }
+    assert diff_entries(old, new) == {
+        "added": {"SOL": {"price": 4}},
+        "changed": {"BTC": {"volume": 6, "note": None}},
+        "removed": ["DOGE"],
+    }
+    assert diff_entries({"a": 1}, {"a": 2}) == {"added": {}, "changed": {"a": 2}, "removed": []}
+
+
+def test_first_delta_is_full_then_diff():
+    tracker = DeltaTracker()
+    session = Session()
+    first_data = tickers(("BTCUSDT", "1"), ("ETHUSDT", "2"))
+    first = tracker.deliver("/price", first_data, session, delta=True)
+    assert first["full"] is True
+    assert first["base"] is None
+    assert first["data"] is first_data
+
+    second = tracker.deliver("/price", tickers(("BTCUSDT", "1"), ("ETHUSDT", "3")), session, delta=True)
+    assert second["full"] is False
+    assert second["base"] == first["version"]
+    assert second["version"] != first["version"]
+    assert second["changed"] == {"ETHUSDT": {"lastPrice": "3"}}
+    assert second["added"] == {} and second["removed"] == []
+
+
+def test_unchanged_document_gives_empty_delta():
+    tracker = DeltaTracker()
+    session = Session()
+    first = tracker.deliver("/price", tickers(("BTCUSDT", "1")), session, delta=True)
+    again = tracker.deliver("/price", tickers(("BTCUSDT", "1")), session, delta=True)
+    assert again["version"] == again["base"] == first["version"]
+    assert again["added"] == again["changed"] == {} and again["removed"] == []
+
+
+def test_sessions_without_delta_are_not_tracked():
+    tracker = DeltaTracker()
+    data = tickers(("BTCUSDT", "1"))
+    assert tracker.deliver("/price", data, Session()) is data
+    assert tracker.deliver("/price", data) is data
+    assert not tracker._documents
+
+
+def test_full_read_after_opting_in_moves_the_base():
+    tracker = DeltaTracker()
+    session = Session()
+    tracker.deliver("/price", tickers(("BTCUSDT", "1")), session, delta=True)
+    full = tickers(("BTCUSDT", "2"))
+    # A plain read by a session that opted in still records what it was sent
+    assert tracker.deliver("/price", full, session) is full
+    delta = tracker.deliver("/price", tickers(("BTCUSDT", "2"), ("ETHUSDT", "3")), session, delta=True)
+    assert delta["changed"] == {}
+    assert delta["added"] == {"ETHUSDT": {"symbol": "ETHUSDT", "lastPrice": "3"}}
+
+
+def test_since_token_overrides_session_base():
+    tracker = DeltaTracker()
+    session = Session()
+    first = tracker.deliver("/price", tickers(("BTCUSDT", "1")), session, delta=True)
+    tracker.deliver("/price", tickers(("BTCUSDT", "2")), session, delta=True)
+    # Another client can diff against a token it holds, without a session
+    delta = tracker.deliver("/price", tickers(("BTCUSDT", "3")), since=first["version"], delta=True)
+    assert delta["base"] == first["version"]
+    assert delta["changed"] == {"BTCUSDT": {"lastPrice": "3"}}
+
+
+def test_unknown_or_evicted_base_gives_full_document():
+    tracker = DeltaTracker(max_versions=2)
+    unknown = tracker.deliver("/price", tickers(("BTCUSDT", "1")), delta=True, since="0000000000000000")
+    assert unknown["full"] is True
+
+    first = tracker.deliver("/price", tickers(("BTCUSDT", "1")), delta=True)
+    for price in ("2", "3"):
+        tracker.deliver("/price", tickers(("BTCUSDT", price)), delta=True)
+    evicted = tracker.deliver("/price", tickers(("BTCUSDT", "4")), delta=True, since=first["version"])
+    assert evicted["full"] is True
+    assert evicted["base"] is None
+
+
+def test_documents_tracked_separately_per_session():
+    tracker = DeltaTracker()
+    one, two = Session(), Session()
+    tracker.deliver("/price", tickers(("BTCUSDT", "1")), one, delta=True)
+    tracker.deliver("/price", tickers(("BTCUSDT", "2")), one, delta=True)
+    # The second session has not seen any version yet
+    assert tracker.deliver("/price", tickers(("BTCUSDT", "2")), two, delta=True)["full"] is True
+    assert tracker.deliver("/trend", {"trend": "up"}, one, delta=True)["full"] is True
@@ -0,0 +1,59 @@
+import asyncio
+import signal
+
+from desk3_service.admission import AdmissionController, FairScheduler
+from desk3_service.drain import Drainer
+
+
+def test_lifespan_shuts_down_then_closes():
+    async def scenario():
+        steps = []
+        started = asyncio.Event()
+
+        async def warm_up():
+            started.set()
+            await asyncio.sleep(60)
+
+        async def shutdown():
+            steps.append("shutdown")
+
+        async def close():
+            steps.append("close")
+
+        drainer = Drainer(AdmissionController(), FairScheduler(), warm_up=warm_up, shutdown=shutdown, close=close)
+        async with drainer.lifespan(None):
+            await started.wait()
+            assert drainer.state == "starting"
+        # The lifespan ran the shutdown steps already, a late drain does not repeat them
+        await drainer.drain()
+        return steps
+
+    previous = signal.getsignal(signal.SIGTERM)
+    try:
+        assert asyncio.run(scenario()) == ["shutdown", "close"]
+    finally:
+        signal.signal(signal.SIGTERM, previous)
+
+
+def test_close_runs_after_drain_and_failures_are_logged():
+    async def scenario():
+        steps = []
+
+        async def shutdown():
+            steps.append("shutdown")
+
+        async def close():
+            steps.append("close")
+            raise ConnectionError("gone")
+
+        drainer = Drainer(AdmissionController(), FairScheduler(), shutdown=shutdown, close=close)
+        async with drainer.lifespan(None):
+            await drainer.drain()
+            assert steps == ["shutdown"]
+        return steps
+
+    previous = signal.getsignal(signal.SIGTERM)
+    try:
+        assert asyncio.run(scenario()) == ["shutdown", "close"]
+    finally:
+        signal.signal(signal.SIGTERM, previous)
@@ -0,0 +1,64 @@
+import asyncio
+
+import pytest
+
+from desk3_service.economic_calendar import CalendarStore
+
+
+def test_concurrent_callers_share_one_fetch():
+    async def scenario():
+        calls = []
+
+        async def fetch(month):
+            calls.append(month)
+            await asyncio.sleep(0.05)
+            return {"data": []}
+
+        store = CalendarStore(fetch)
+        first, second = await asyncio.gather(store.month("2026-01"), store.month("2026-01"))
+        return calls, first is second, store._loading
+
+    calls, same, loading = asyncio.run(scenario())
+    assert calls == ["2026-01"]
+    assert same
+    assert not loading
+
+
+def test_cancelled_first_caller_does_not_strand_others():
+    async def scenario():
+        async def fetch(month):
+            await asyncio.sleep(0.05)
+            return {"data": []}
+
+        store = CalendarStore(fetch)
+        first = asyncio.create_task(store.month("2026-01"))
+        await asyncio.sleep(0)
+        second = asyncio.create_task(store.month("2026-01"))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        index = await asyncio.wait_for(second, 1)
+        return first.cancelled(), index, store
+
+    cancelled, index, store = asyncio.run(scenario())
+    assert cancelled
+    assert store.months["2026-01"] is index
+    assert not store._loading
+
+
+def test_failed_fetch_is_raised_and_retried():
+    async def scenario():
+        attempts = []
+
+        async def fetch(month):
+            attempts.append(month)
+            if len(attempts) == 1:
+                raise RuntimeError("upstream down")
+            return {"data": []}
+
+        store = CalendarStore(fetch)
+        with pytest.raises(RuntimeError, match="upstream down"):
+            await store.month("2026-01")
+        await store.month("2026-01")
+        return attempts
+
+    assert asyncio.run(scenario()) == ["2026-01", "2026-01"]
@@ -0,0 +1,52 @@
+import pytest
+
+from desk3_service.pagination import SnapshotStore, decode_cursor, encode_cursor
+
+
+def collect(store: SnapshotStore, rows: list, key: str, page_size: int) -> list:
+    page = store.first_page(rows, key, page_size)
+    items = list(page["items"])
+    while page["nextCursor"]:
+        page = store.page(page["nextCursor"], key)
+        items += page["items"]
+    return items
+
+
+def test_pages_cover_all_rows_and_release_the_snapshot():
+    store = SnapshotStore()
+    rows = list(range(10))
+    assert collect(store, rows, "/btc/trend", 3) == rows
+    assert store._rows == 0
+
+
+def test_single_page_keeps_no_snapshot():
+    store = SnapshotStore()
+    page = store.first_page([1, 2], "/price", 5)
+    assert page == {"items": [1, 2], "total": 2, "nextCursor": None}
+    assert not store._snapshots
+
+
+def test_cursor_rejected_for_another_request():
+    store = SnapshotStore()
+    cursor = store.first_page(list(range(10)), "/btc/trend", 3)["nextCursor"]
+    with pytest.raises(ValueError, match="different request"):
+        store.page(cursor, "/mini/24hr")
+    # The rightful request can still continue
+    assert store.page(cursor, "/btc/trend")["items"] == [3, 4, 5]
+
+
+def test_row_budget_evicts_oldest_but_keeps_newest():
+    store = SnapshotStore(max_rows=15)
+    old = store.first_page(list(range(10)), "/price", 2)["nextCursor"]
+    new = store.first_page(list(range(10)), "/mini/24hr", 2)["nextCursor"]
+    with pytest.raises(ValueError, match="expired"):
+        store.page(old, "/price")
+    assert store.page(new, "/mini/24hr")["items"] == [2, 3]
+    huge = store.first_page(list(range(100)), "/btc/trend", 50)["nextCursor"]
+    assert store.page(huge, "/btc/trend")["total"] == 100
+
+
+def test_invalid_cursor():
+    assert decode_cursor(encode_cursor("abc", 4, 2)) == ("abc", 4, 2)
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        decode_cursor("not a cursor")
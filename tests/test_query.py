@@ -0,0 +1,85 @@
+import pytest
+
+from desk3_service.query import apply_query, has_query, query_rows
+
+TICKERS = [
+    {"symbol": "BTCUSDT", "lastPrice": "65000", "quoteVolume": "9000000"},
+    {"symbol": "ETHUSDT", "lastPrice": "3000", "quoteVolume": "5000000"},
+    {"symbol": "ETHBTC", "lastPrice": "0.046", "quoteVolume": "1200"},
+    {"symbol": "SOLUSDT", "lastPrice": "150", "quoteVolume": "2000000"},
+    {"symbol": "NEWUSDT", "lastPrice": "1"},
+]
+
+
+def symbols(rows: list) -> list[str]:
+    return [row["symbol"] for row in rows]
+
+
+def test_filter_numeric_and_contains():
+    rows = query_rows(TICKERS, filter="quoteVolume>=2000000,symbol~usdt")
+    assert symbols(rows) == ["BTCUSDT", "ETHUSDT", "SOLUSDT"]
+
+
+def test_filter_compares_numeric_strings_as_numbers():
+    # "150" > "1000" as strings, but not as numbers
+    assert symbols(query_rows(TICKERS, filter="lastPrice>1000")) == ["BTCUSDT", "ETHUSDT"]
+
+
+def test_filter_equality_is_case_insensitive_for_text():
+    assert symbols(query_rows(TICKERS, filter="symbol=ethbtc")) == ["ETHBTC"]
+    assert symbols(query_rows(TICKERS, filter="symbol!=ETHBTC,symbol~ETH")) == ["ETHUSDT"]
+
+
+def test_filter_drops_rows_missing_the_field():
+    assert "NEWUSDT" not in symbols(query_rows(TICKERS, filter="quoteVolume<5000000"))
+
+
+def test_invalid_filter_rejected():
+    with pytest.raises(ValueError, match="Invalid filter condition"):
+        query_rows(TICKERS, filter="quoteVolume")
+
+
+def test_full_sort_puts_missing_fields_last_in_both_directions():
+    assert symbols(query_rows(TICKERS, sort="quoteVolume")) == ["ETHBTC", "SOLUSDT", "ETHUSDT", "BTCUSDT", "NEWUSDT"]
+    assert symbols(query_rows(TICKERS, sort="-quoteVolume")) == ["BTCUSDT", "ETHUSDT", "SOLUSDT", "ETHBTC", "NEWUSDT"]
+
+
+def test_heap_limit_matches_full_sort():
+    rows = [{"symbol": f"S{i}", "volume": (i * 37) % 101} for i in range(200)]
+    for sort in ("volume", "-volume"):
+        for offset, limit in ((0, 5), (3, 4), (10, 1)):
+            expected = query_rows(rows, sort=sort)[offset:offset + limit]
+            assert query_rows(rows, sort=sort, limit=limit, offset=offset) == expected
+
+
+def test_limit_offset_and_projection():
+    rows = query_rows(TICKERS, fields="symbol,lastPrice", sort="-lastPrice", limit=2, offset=1)
+    assert rows == [{"symbol": "ETHUSDT", "lastPrice": "3000"}, {"symbol": "SOLUSDT", "lastPrice": "150"}]
+
+
+def test_array_rows_addressed_by_column_index():
+    rows = [[1700000000, 3.5], [1700086400, 1.5], [1700172800, 2.5]]
+    assert query_rows(rows, sort="-1", limit=2, fields="1") == [[3.5], [2.5]]
+
+
+def test_negative_limit_rejected():
+    with pytest.raises(ValueError):
+        query_rows(TICKERS, limit=-1)
+
+
+def test_apply_query_wrapped_data_list_and_objects():
+    wrapped = {"code": 0, "data": TICKERS}
+    result = apply_query(wrapped, {"filter": "symbol~SOL", "fields": "symbol"})
+    assert result == {"code": 0, "data": [{"symbol": "SOLUSDT"}]}
+    assert apply_query({"value": 40, "label": "Fear"}, {"fields": "value"}) == {"value": 40}
+
+
+def test_apply_query_parses_string_arguments_from_resources():
+    assert symbols(apply_query(TICKERS, {"sort": "-quoteVolume", "limit": "1"})) == ["BTCUSDT"]
+    with pytest.raises(ValueError, match="integers"):
+        apply_query(TICKERS, {"limit": "ten"})
+
+
+def test_no_query_returns_data_unchanged():
+    assert not has_query({"symbol": "BTCUSDT", "limit": ""})
+    assert apply_query(TICKERS, {"symbol": "BTCUSDT"}) is TICKERS